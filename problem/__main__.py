@@ -0,0 +1,5 @@
+import sys
+from problem.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from problem.knapsack import KnapsackProblem
+from problem.genetic import GeneticAlgorithm
+from problem.runner import run_seeds
+
+INSTANCE_TYPES = ('uncorrelated', 'weakly_correlated', 'strongly_correlated')
+SELECTION_TYPES = ('tournament', 'random', 'roulette')
+CROSSOVER_TYPES = ('one_point', 'two_points', 'uniform')
+MUTATION_TYPES = ('uniform', 'scramble')
+
+# Bảng quy hoạch động cho lời giải tối ưu được giới hạn nhỏ hơn mặc định để benchmark không bị kéo dài,
+# vượt quá thì so sánh với cận trên nới lỏng tuyến tính
+DEFAULT_MAX_CELLS = 20_000_000
+
+
+def generate_instance(num_items, correlation='uncorrelated', max_weight=100, max_quantity=5, capacity_ratio=0.5, seed=None):
+    # Bộ dữ liệu tổng hợp theo mức tương quan giữa trọng lượng và giá trị:
+    # uncorrelated - giá trị độc lập, weakly_correlated - giá trị = trọng lượng ± max_weight/10,
+    # strongly_correlated - giá trị = trọng lượng + max_weight/10 (khó nhất với các heuristic theo tỉ lệ)
+    if correlation not in INSTANCE_TYPES:
+        raise ValueError(f"Kiểu tương quan không hợp lệ: {correlation!r}. Chọn một trong {INSTANCE_TYPES}.")
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, max_weight + 1, size=num_items)
+    spread = max(max_weight // 10, 1)
+    if correlation == 'uncorrelated':
+        values = rng.integers(1, max_weight + 1, size=num_items)
+    elif correlation == 'weakly_correlated':
+        values = np.maximum(weights + rng.integers(-spread, spread + 1, size=num_items), 1)
+    else:
+        values = weights + spread
+    quantities = rng.integers(1, max_quantity + 1, size=num_items)
+
+    items = [
+        {
+            "number": i + 1,
+            "name": f"item_{i + 1}",
+            "weight": int(weights[i]),
+            "value": int(values[i]),
+            "Max_quantity": int(quantities[i])
+        }
+        for i in range(num_items)
+    ]
+    capacity = max(int(capacity_ratio * int(weights @ quantities)), 1)
+    return KnapsackProblem(items, capacity=capacity)
+
+
+def time_call(function, repeat=5):
+    # Thời gian nhỏ nhất qua các lần lặp, ít bị nhiễu bởi tiến trình khác hơn trung bình
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def reference_value(problem, max_cells=DEFAULT_MAX_CELLS):
+    # Giá trị tối ưu nếu quy hoạch động chạy được, nếu không thì cận trên LP
+    try:
+        return problem.solve_exact(max_cells)["value"], 'exact'
+    except ValueError:
+        return problem.lp_bound()["value"], 'lp_bound'
+
+
+def benchmark_operators(problem, params, repeat=5, seed=None):
+    # Đo từng toán tử trên một quần thể ngẫu nhiên (biểu diễn mảng), mỗi toán tử xử lý cả quần thể
+    ga = GeneticAlgorithm(problem, seed=seed, **{**params, "representation": "array", "incrementalFitness": False})
+    ga.initial_population()
+    population = ga.population
+    size = len(population)
+    ga.fitnesses = ga.evaluate_population(population)
+    rows = []
+
+    def add(operator, kind, seconds, work):
+        rows.append({
+            "benchmark": "operator",
+            "operator": operator,
+            "type": kind,
+            "population_size": size,
+            "seconds": seconds,
+            "per_second": work / seconds if seconds > 0 else None
+        })
+
+    individuals = [list(individual) for individual in population]
+    add("fitness", "single", time_call(lambda: [problem.fitness(individual) for individual in individuals], repeat), size)
+    add("fitness", "batch", time_call(lambda: problem.fitness_batch(population), repeat), size)
+
+    for selection_type in SELECTION_TYPES:
+        ga.selectionType = selection_type
+        ga.prepare_selection()
+        add("selection", selection_type, time_call(lambda: ga.select_parents(size), repeat), size)
+
+    parents1, parents2 = population[0::2], population[1::2]
+    for crossover_type in CROSSOVER_TYPES:
+        ga.crossoverType = crossover_type
+        add("crossover", crossover_type, time_call(lambda: ga.crossover_batch(parents1, parents2), repeat), 2 * len(parents1))
+
+    for mutation_type in MUTATION_TYPES:
+        ga.mutationType = mutation_type
+        add("mutation", mutation_type, time_call(lambda: ga.mutate_batch(population.copy()), repeat), size)
+    return rows
+
+
+def benchmark_run(problem, params, runs=3, seed=None, reference=None):
+    # Chạy GA đầy đủ runs lần; bộ nhớ đỉnh đo riêng ở một lần chạy vì tracemalloc làm chậm đáng kể
+    seeds = run_seeds(runs, seed)
+    best, generations_per_second, evaluations_per_second, elapsed = [], [], [], []
+    for run_seed in seeds:
+        logs = GeneticAlgorithm(problem, seed=run_seed, **params).run()
+        best.append(logs.best_fitness)
+        elapsed.append(logs.elapsed)
+        generations_per_second.append(len(logs) / logs.elapsed if logs.elapsed > 0 else 0.0)
+        evaluations_per_second.append(logs.evaluations / logs.elapsed if logs.elapsed > 0 else 0.0)
+
+    tracemalloc.start()
+    try:
+        GeneticAlgorithm(problem, seed=seeds[0], **params).run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    row = {
+        "benchmark": "run",
+        "runs": runs,
+        "elapsed": float(np.mean(elapsed)),
+        "generations_per_second": float(np.mean(generations_per_second)),
+        "evaluations_per_second": float(np.mean(evaluations_per_second)),
+        "peak_memory": peak_memory,
+        "best_fitness": float(np.mean(best)),
+        "best_fitness_max": float(np.max(best))
+    }
+    if reference:
+        row["gap"] = (reference - row["best_fitness"]) / reference
+    return row
+
+
+def git_commit():
+    # Commit hiện tại để so sánh kết quả giữa các phiên bản, None nếu không có git
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run_benchmarks(sizes, correlations, params, runs=3, repeat=5, seed=None, max_cells=DEFAULT_MAX_CELLS):
+    # Mỗi bộ dữ liệu (kích thước × kiểu tương quan) cho các dòng toán tử và một dòng chạy đầy đủ
+    environment = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__
+    }
+    rows = []
+    instance_seeds = run_seeds(len(sizes) * len(correlations), seed)
+    for index, (num_items, correlation) in enumerate((n, c) for n in sizes for c in correlations):
+        instance_seed, operator_seed, run_seed = instance_seeds[index].spawn(3)
+        problem = generate_instance(num_items, correlation, seed=instance_seed)
+        reference, reference_kind = reference_value(problem, max_cells)
+        instance = {
+            **environment,
+            "items": num_items,
+            "correlation": correlation,
+            "capacity": problem.capacity
+        }
+        for row in benchmark_operators(problem, params, repeat, operator_seed):
+            rows.append({**instance, **row})
+        rows.append({
+            **instance,
+            **benchmark_run(problem, params, runs, run_seed, reference),
+            "reference": reference,
+            "reference_kind": reference_kind
+        })
+    return rows
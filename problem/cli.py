@@ -0,0 +1,290 @@
+import argparse
+import csv
+import json
+import sys
+import numpy as np
+from problem.genetic import GeneticAlgorithm
+from problem.loader import load_problem
+from problem.runner import MultiRunExecutor, run_seeds
+from problem.sweep import ParameterSweep
+from problem.bench import INSTANCE_TYPES, DEFAULT_MAX_CELLS, run_benchmarks
+from problem.profiler import format_profile
+from problem.islands import TOPOLOGIES, IslandModel
+
+
+def parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(specs):
+    # "populationSize=20,50,100" → {"populationSize": [20, 50, 100]}
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if not values:
+            raise ValueError(f"Tham số khảo sát không hợp lệ: {spec!r}, cần dạng ten=v1,v2,...")
+        grid[name] = [parse_value(value) for value in values.split(',')]
+    return grid
+
+
+def ga_params(args):
+    return {
+        "populationSize": args.population_size,
+        "generations": args.generations,
+        "crossoverType": args.crossover_type,
+        "selectionType": args.selection_type,
+        "mutationType": args.mutation_type,
+        "crossoverRate": args.crossover_rate,
+        "mutationRate": args.mutation_rate,
+        "tournamentSize": args.tournament_size,
+        "representation": args.representation,
+        "fitnessCacheSize": args.fitness_cache_size,
+        "logMode": args.log_mode,
+        "snapshotInterval": args.snapshot_interval,
+        "stagnationWindow": args.stagnation_window,
+        "targetFitness": args.target_fitness,
+        "timeLimit": args.time_limit,
+        "maxEvaluations": args.max_evaluations,
+        "diversityThreshold": args.diversity_threshold,
+        "seedFraction": args.seed_fraction,
+        "constraintHandling": args.constraint_handling,
+        "penaltyFactor": args.penalty_factor,
+        "incrementalFitness": args.incremental_fitness,
+        "profile": args.profile,
+        "replacement": args.replacement,
+        "eliteSize": args.elite_size,
+        "offspringSize": args.offspring_size,
+        "deduplicate": args.deduplicate,
+        "duplicateReplacement": args.duplicate_replacement,
+        "trackDiversity": args.track_diversity
+    }
+
+
+def summarize_logs(run_index, logs, history=False):
+    result = {
+        "run": run_index + 1,
+        "best_fitness": float(logs.best_fitness),
+        "best_generation": logs.best_generation,
+        "generations": len(logs),
+        "stop_reason": logs.stop_reason,
+        "evaluations": logs.evaluations,
+        "elapsed": logs.elapsed,
+        "best_individual": [int(gene) for gene in logs.best_individual]
+    }
+    if logs.duplicates_replaced:
+        result["duplicates_replaced"] = logs.duplicates_replaced
+    if logs.profile:
+        result["profile"] = logs.profile
+    if history:
+        result["history"] = {
+            "best": logs.best.tolist(),
+            "avg": logs.avg.tolist(),
+            "worst": logs.worst.tolist()
+        }
+        if not np.isnan(logs.diversity).all():
+            result["history"]["diversity"] = logs.diversity.tolist()
+    return result
+
+
+def command_run(args, problem):
+    params = ga_params(args)
+    if args.seed_exact:
+        params["initialIndividuals"] = [problem.solve_exact(args.max_cells)["individual"]]
+    if args.runs == 1:
+        # Một lần chạy thì chạy luôn trong tiến trình hiện tại, cùng luồng ngẫu nhiên với lần chạy đầu của executor
+        logs = GeneticAlgorithm(problem, seed=run_seeds(1, args.seed)[0], **params).run()
+        return [summarize_logs(0, logs, args.history)]
+
+    results = []
+    with MultiRunExecutor(problem, args.workers) as executor:
+        for run_index, logs in executor.repeat(params, args.runs, args.seed):
+            results.append(summarize_logs(run_index, logs, args.history))
+    return sorted(results, key=lambda result: result["run"])
+
+
+def command_islands(args, problem):
+    model = IslandModel(
+        problem, ga_params(args), args.islands, args.topology, args.migration_interval, args.migration_size
+    )
+    result = model.run(args.seed)
+    rows = []
+    for island, logs in enumerate(result["islands"]):
+        row = summarize_logs(island, logs, args.history)
+        row["island"] = row.pop("run")
+        rows.append(row)
+    rows.append({
+        "island": "all",
+        "best_fitness": float(result["best_fitness"]),
+        "best_island": result["best_island"] + 1,
+        "evaluations": result["evaluations"],
+        "elapsed": result["elapsed"],
+        "best_individual": [int(gene) for gene in result["best_individual"]]
+    })
+    return rows
+
+
+def command_exact(args, problem):
+    solution = problem.solve_exact(args.max_cells)
+    return [{
+        "best_fitness": solution["value"],
+        "weight": solution["weight"],
+        "time": solution["time"],
+        "memory": solution["memory"],
+        "cells": solution["cells"],
+        "best_individual": solution["individual"].tolist()
+    }]
+
+
+def command_bounds(args, problem):
+    greedy = problem.greedy_solution()
+    return [{
+        "greedy_value": problem.fitness(greedy),
+        "lp_bound": problem.lp_bound()["value"],
+        "greedy_individual": greedy.tolist()
+    }]
+
+
+def command_sweep(args, problem):
+    sweep = ParameterSweep(problem, ga_params(args), runs=args.runs, workers=args.workers)
+    return [{**cell, **stats} for cell, stats in sweep.run(parse_grid(args.param), args.seed)]
+
+
+def command_bench(args):
+    sizes = [int(size) for size in args.sizes.split(',')]
+    correlations = args.correlations.split(',')
+    return run_benchmarks(sizes, correlations, ga_params(args), args.runs, args.repeat, args.seed, args.max_cells)
+
+
+def write_results(results, output_format, stream):
+    if output_format == 'json':
+        json.dump(results, stream, ensure_ascii=False, indent=2)
+        stream.write('\n')
+        return
+
+    # CSV chỉ giữ các cột vô hướng, danh sách được ghi dưới dạng JSON
+    fieldnames = []
+    for result in results:
+        fieldnames.extend(key for key in result if key not in fieldnames)
+    writer = csv.DictWriter(stream, fieldnames=fieldnames)
+    writer.writeheader()
+    for result in results:
+        writer.writerow({
+            key: json.dumps(value) if isinstance(value, (list, dict)) else value
+            for key, value in result.items()
+        })
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m problem",
+        description="Giải bài toán cái túi bằng thuật toán di truyền, không cần giao diện."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Chạy GA một hoặc nhiều lần với cùng tham số")
+    run_parser.add_argument("--history", action="store_true", help="Ghi thêm best/avg/worst theo từng thế hệ")
+    run_parser.add_argument("--seed-exact", action="store_true", help="Đưa lời giải quy hoạch động vào quần thể ban đầu")
+    run_parser.add_argument("--max-cells", type=int, default=None, help="Giới hạn kích thước bảng quy hoạch động")
+
+    exact_parser = commands.add_parser("exact", help="Lời giải chính xác bằng quy hoạch động (trọng lượng nguyên)")
+    exact_parser.add_argument("--max-cells", type=int, default=None, help="Giới hạn kích thước bảng quy hoạch động")
+
+    sweep_parser = commands.add_parser("sweep", help="Khảo sát lưới tham số")
+    sweep_parser.add_argument(
+        "--param", action="append", required=True,
+        help="Tham số khảo sát dạng ten=v1,v2,... (lặp lại để tạo tích Descartes, có thể dùng 'runs')"
+    )
+
+    commands.add_parser("bounds", help="Cận dưới greedy và cận trên nới lỏng tuyến tính")
+
+    islands_parser = commands.add_parser("islands", help="GA mô hình đảo: các quần thể con chạy song song và trao đổi cá thể")
+    islands_parser.add_argument("--islands", type=int, default=4, help="Số đảo (mỗi đảo một tiến trình)")
+    islands_parser.add_argument("--topology", default="ring", choices=TOPOLOGIES)
+    islands_parser.add_argument("--migration-interval", type=int, default=10, help="Số thế hệ giữa hai lần di cư (0: không di cư)")
+    islands_parser.add_argument("--migration-size", type=int, default=2, help="Số cá thể tốt nhất gửi đi mỗi lần")
+    islands_parser.add_argument("--history", action="store_true", help="Ghi thêm best/avg/worst theo từng thế hệ")
+
+    bench_parser = commands.add_parser("bench", help="Benchmark toán tử và GA trên bộ dữ liệu tổng hợp")
+    bench_parser.add_argument("--sizes", default="50,200,1000", help="Danh sách số vật phẩm, vd. 50,200,1000")
+    bench_parser.add_argument("--correlations", default=",".join(INSTANCE_TYPES), help=f"Kiểu tương quan: {', '.join(INSTANCE_TYPES)}")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Số lần lặp khi đo mỗi toán tử (lấy thời gian nhỏ nhất)")
+    bench_parser.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS, help="Giới hạn bảng quy hoạch động khi tính lời giải tối ưu")
+
+    for name, sub in commands.choices.items():
+        if name != "bench":
+            sub.add_argument("items", help="File vật phẩm (.csv, .xlsx, .parquet, .npz) với các cột name, weight, value, Max_quantity")
+            sub.add_argument("--capacity", type=float, required=True)
+            sub.add_argument("--no-cache", action="store_true", help="Không đọc / ghi file cache .npz cạnh file vật phẩm")
+        sub.add_argument("--population-size", type=int, default=50)
+        sub.add_argument("--generations", type=int, default=100)
+        sub.add_argument("--crossover-type", default="uniform", choices=["one_point", "two_points", "uniform"])
+        sub.add_argument("--selection-type", default="tournament", choices=["tournament", "random", "roulette"])
+        sub.add_argument("--mutation-type", default="uniform", choices=["uniform", "scramble"])
+        sub.add_argument("--crossover-rate", type=float, default=0.8)
+        sub.add_argument("--mutation-rate", type=float, default=0.05)
+        sub.add_argument("--tournament-size", type=int, default=3)
+        sub.add_argument("--representation", default="array", choices=["list", "array"])
+        sub.add_argument("--fitness-cache-size", type=int, default=0)
+        sub.add_argument("--log-mode", default="minimal", choices=["full", "improvement", "minimal"])
+        sub.add_argument("--snapshot-interval", type=int, default=0)
+        sub.add_argument("--stagnation-window", type=int, default=None, help="Dừng khi best không cải thiện sau N thế hệ")
+        sub.add_argument("--target-fitness", type=float, default=None)
+        sub.add_argument("--time-limit", type=float, default=None, help="Giới hạn thời gian mỗi lần chạy (giây)")
+        sub.add_argument("--max-evaluations", type=int, default=None)
+        sub.add_argument("--diversity-threshold", type=float, default=None, help="Dừng khi tỉ lệ bộ gen khác nhau < ngưỡng")
+        sub.add_argument("--seed-fraction", type=float, default=0.0, help="Tỉ lệ quần thể ban đầu lấy từ greedy")
+        sub.add_argument("--constraint-handling", default="zero", choices=["zero", "repair", "penalty"])
+        sub.add_argument("--penalty-factor", type=float, default=1.0)
+        sub.add_argument("--incremental-fitness", action="store_true")
+        sub.add_argument("--profile", action="store_true", help="Đo thời gian theo pha của GA, in bảng ra stderr")
+        sub.add_argument("--replacement", default="generational", choices=["generational", "steady_state", "mu_plus_lambda"])
+        sub.add_argument("--elite-size", type=int, default=None, help="Số cá thể tốt nhất giữ nguyên mỗi thế hệ, mọi kiểu --replacement (mặc định: 1)")
+        sub.add_argument("--offspring-size", type=int, default=None, help="Số con mỗi thế hệ (mặc định: 2 với steady_state, populationSize với mu_plus_lambda)")
+        sub.add_argument("--deduplicate", action="store_true", help="Thay các bộ gen trùng trước khi đánh giá")
+        sub.add_argument("--duplicate-replacement", default="mutate", choices=["mutate", "random"])
+        sub.add_argument("--track-diversity", action="store_true", help="Ghi tỉ lệ bộ gen khác nhau mỗi thế hệ")
+        sub.add_argument("--runs", type=int, default=1)
+        sub.add_argument("--workers", type=int, default=None, help="Số tiến trình (mặc định: số lõi CPU)")
+        sub.add_argument("--seed", type=int, default=None)
+        sub.add_argument("--format", default="json", choices=["json", "csv"])
+        sub.add_argument("--output", default=None, help="File kết quả (mặc định: stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "bench":
+            results = command_bench(args)
+        else:
+            problem = load_problem(args.items, args.capacity, cache=not args.no_cache)
+            if args.command == "run":
+                results = command_run(args, problem)
+            elif args.command == "exact":
+                results = command_exact(args, problem)
+            elif args.command == "bounds":
+                results = command_bounds(args, problem)
+            elif args.command == "islands":
+                results = command_islands(args, problem)
+            else:
+                results = command_sweep(args, problem)
+    except (OSError, ImportError, ValueError, RuntimeError) as e:
+        print(f"Lỗi: {e}", file=sys.stderr)
+        return 1
+
+    for result in results:
+        if "profile" in result:
+            print(f"[Run {result.get('run', result.get('island'))}]", file=sys.stderr)
+            print(format_profile(result["profile"]), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            write_results(results, args.format, f)
+    else:
+        write_results(results, args.format, sys.stdout)
+    return 0
@@ -1,8 +1,46 @@
 from problem.knapsack import KnapsackProblem
 import random
 import copy
+import time
+from collections import OrderedDict
+import numpy as np
+from problem.log import GenerationLog
+from problem.profiler import PhaseProfiler, no_phase
+
+
+class FitnessCache:
+    # LRU cache giới hạn kích thước, khoá là bytes của bộ gen
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
 
 class GeneticAlgorithm:
+    # Số thế hệ giữa hai lần tính lại toàn bộ tổng trọng lượng / giá trị để tránh sai số cộng dồn
+    TOTALS_RESYNC_INTERVAL = 100
+    # Số lượt tối đa tìm và thay bộ gen trùng mỗi thế hệ (bản đột biến có thể lại trùng cá thể khác)
+    DEDUPLICATE_PASSES = 3
+    # Khoảng thời gian tối thiểu giữa hai lần hỏi cancel_event ngoài các lần báo tiến độ;
+    # event của multiprocessing.Manager là proxy, mỗi lần hỏi là một lượt gửi nhận qua tiến trình khác
+    CANCEL_CHECK_SECONDS = 0.1
+
     def __init__(
         self, 
         problem: KnapsackProblem, 
@@ -12,7 +50,30 @@ class GeneticAlgorithm:
         selectionType, 
         mutationType,
         crossoverRate=0.8, 
-        mutationRate=0.05
+        mutationRate=0.05,
+        representation='list',
+        fitnessCacheSize=0,
+        tournamentSize=3,
+        seed=None,
+        logMode='improvement',
+        snapshotInterval=0,
+        stagnationWindow=None,
+        targetFitness=None,
+        timeLimit=None,
+        maxEvaluations=None,
+        diversityThreshold=None,
+        initialIndividuals=None,
+        seedFraction=0.0,
+        constraintHandling='zero',
+        penaltyFactor=1.0,
+        incrementalFitness=False,
+        profile=False,
+        replacement='generational',
+        eliteSize=None,
+        offspringSize=None,
+        deduplicate=False,
+        duplicateReplacement='mutate',
+        trackDiversity=False
     ):
         self.problem        = problem
         self.populationSize = populationSize
@@ -22,16 +83,129 @@ class GeneticAlgorithm:
         self.mutationType = mutationType
         self.selectionType = selectionType
         self.mutationRate   = mutationRate
+        self.tournamentSize = tournamentSize
+        self.representation = representation
         self.population     = []
-        self.logs           = []
+        self.fitnesses      = np.empty(0)
+        self.cumulative_fitness = None
+        self.logMode        = logMode
+        self.snapshotInterval = snapshotInterval
+        self.logs           = GenerationLog(generations, logMode, snapshotInterval)
+        self.evaluations    = 0
+        self.start_time     = None
+        self.initialIndividuals = initialIndividuals or []  # cá thể mồi, vd. lời giải chính xác
+        self.seedFraction   = seedFraction  # tỉ lệ quần thể ban đầu lấy từ greedy / greedy ngẫu nhiên
+
+        # Điều kiện dừng sớm, None nghĩa là không dùng
+        self.stagnationWindow   = stagnationWindow      # số thế hệ liên tiếp best không cải thiện
+        self.targetFitness      = targetFitness         # đạt fitness mục tiêu
+        self.timeLimit          = timeLimit             # giới hạn thời gian chạy (giây)
+        self.maxEvaluations     = maxEvaluations        # giới hạn số lần tính fitness
+        self.diversityThreshold = diversityThreshold    # tỉ lệ bộ gen khác nhau tối thiểu (0..1)
+        self.fitness_cache  = FitnessCache(fitnessCacheSize) if fitnessCacheSize > 0 else None
+        # seed: None, số nguyên, np.random.SeedSequence hoặc np.random.Generator dùng chung
+        self.rng            = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        # Luồng random của Python riêng cho từng GA, suy ra từ self.rng nên cùng seed cho cùng kết quả
+        self.random         = random.Random(int(self.rng.integers(2 ** 63)))
+
+        # Xử lý cá thể vượt sức chứa: 'zero' (fitness = 0), 'repair' (sửa cho vừa túi), 'penalty' (phạt theo mức vượt)
+        self.constraintHandling = constraintHandling
+        self.penaltyFactor  = penaltyFactor
+
+        if generations < 1 or populationSize < 1:
+            raise ValueError("Số thế hệ và số cá thể phải >= 1.")
+        if representation not in ('list', 'array'):
+            raise ValueError("Kiểu biểu diễn quần thể không hợp lệ. Chọn 'list' hoặc 'array'.")
+        if constraintHandling not in ('zero', 'repair', 'penalty'):
+            raise ValueError("Cách xử lý ràng buộc không hợp lệ. Chọn 'zero', 'repair' hoặc 'penalty'.")
+
+        # Mỗi cá thể mang sẵn tổng trọng lượng / giá trị, đột biến và sửa chỉ cập nhật phần thay đổi
+        self.incrementalFitness = incrementalFitness
+        self.total_weights  = np.empty(0)
+        self.total_values   = np.empty(0)
+        if incrementalFitness and representation != 'array':
+            raise ValueError("incrementalFitness chỉ dùng được với representation='array'.")
+        # Cột trọng lượng và cột giá trị, nhân một lần cho cả hai tổng
+        self.item_totals    = np.column_stack((problem.weights, problem.values)) if incrementalFitness else None
+
+        # Đo thời gian / số lần gọi / cấp phát theo pha, tắt thì self.phase là context rỗng dùng chung
+        self.profile        = profile
+        self.profiler       = None
+        self.phase          = no_phase
+
+        # Cách thay thế quần thể mỗi thế hệ:
+        # 'generational' - thay toàn bộ, giữ eliteSize cá thể tốt nhất
+        # 'steady_state' - chỉ offspringSize cá thể kém nhất (ngoài elite) bị thay tại chỗ bởi con mới
+        # 'mu_plus_lambda' - gộp quần thể (mu) với offspringSize con (lambda), giữ lại mu cá thể tốt nhất,
+        #                    trong đó luôn có eliteSize cha mẹ tốt nhất
+        # eliteSize mặc định là 1, bớt về 0 khi populationSize = 1 để quần thể một cá thể vẫn chạy được
+        self.replacement    = replacement
+        if eliteSize is None:
+            eliteSize = min(1, populationSize - 1)
+        self.eliteSize      = eliteSize
+        if offspringSize is None:
+            offspringSize = min(2, populationSize - eliteSize) if replacement == 'steady_state' else populationSize
+        self.offspringSize  = offspringSize
+        # True khi self.fitnesses đã khớp với quần thể hiện tại (steady_state / mu_plus_lambda
+        # đánh giá con ngay lúc sinh), thế hệ sau không phải tính lại cả quần thể
+        self.evaluated      = False
+        if replacement not in ('generational', 'steady_state', 'mu_plus_lambda'):
+            raise ValueError("Cách thay thế không hợp lệ. Chọn 'generational', 'steady_state' hoặc 'mu_plus_lambda'.")
+        if not 0 <= eliteSize < populationSize:
+            raise ValueError("eliteSize phải nằm trong [0, populationSize).")
+        if offspringSize < 1 or (replacement == 'steady_state' and offspringSize > populationSize - eliteSize):
+            raise ValueError("offspringSize phải >= 1 và với steady_state không vượt quá populationSize - eliteSize.")
+
+        # Mỗi thế hệ thay các bộ gen trùng (giữ lần xuất hiện đầu) trước khi đánh giá:
+        # 'mutate' - đổi một gen ngẫu nhiên của bản trùng, 'random' - thay bằng cá thể ngẫu nhiên mới.
+        # trackDiversity (hoặc deduplicate) ghi tỉ lệ bộ gen khác nhau của mỗi thế hệ vào log
+        self.deduplicate    = deduplicate
+        self.duplicateReplacement = duplicateReplacement
+        self.trackDiversity = trackDiversity
+        if duplicateReplacement not in ('mutate', 'random'):
+            raise ValueError("Cách thay bộ gen trùng không hợp lệ. Chọn 'mutate' hoặc 'random'.")
+
+    def gene_dtype(self):
+        # Kiểu số nguyên nhỏ nhất chứa được Max_quantity lớn nhất
+        max_quantity = int(self.problem.max_quantities.max()) if len(self.problem.max_quantities) else 0
+        for dtype in (np.int8, np.int16, np.int32):
+            if max_quantity <= np.iinfo(dtype).max:
+                return dtype
+        return np.int64
 
     def initial_population(self):
-        self.population = [
-            [random.randint(0, item['Max_quantity']) for item in self.problem.items]
-            for _ in range(self.populationSize)
-        ]
+        if self.representation == 'array':
+            self.population = self.rng.integers(
+                0, self.problem.max_quantities + 1,
+                size=(self.populationSize, len(self.problem.weights))
+            ).astype(self.gene_dtype())
+        else:
+            self.population = [
+                [self.random.randint(0, quantity) for quantity in self.problem.max_quantities.tolist()]
+                for _ in range(self.populationSize)
+            ]
+        self.inject(list(self.initialIndividuals) + self.heuristic_individuals())
+
+    def heuristic_individuals(self):
+        # Một lời giải greedy theo tỉ lệ, phần còn lại là greedy ngẫu nhiên để giữ đa dạng
+        count = int(round(self.seedFraction * self.populationSize))
+        if count <= 0:
+            return []
+        individuals = [self.problem.greedy_solution()]
+        while len(individuals) < count:
+            individuals.append(self.problem.randomized_greedy_solution(self.rng))
+        return individuals
+
+    def inject(self, individuals):
+        # Thay các cá thể đầu quần thể bằng các cá thể mồi cho trước
+        for i, individual in enumerate(individuals[:self.populationSize]):
+            if self.representation == 'array':
+                self.population[i] = individual
+            else:
+                self.population[i] = [int(gene) for gene in individual]
     
-    def selection(self, num_choices=3):
+    def selection(self, num_choices=None):
+        num_choices = num_choices or self.tournamentSize
         if self.selectionType == 'tournament':
             return self.tournament_selection(num_choices)
         elif self.selectionType == 'random':
@@ -44,34 +218,189 @@ class GeneticAlgorithm:
     def evaluate_fitness(self, individual):
         return self.problem.fitness(individual)
 
-    def tournament_selection(self, num_choices=3):
-        candidates = random.choices(self.population, k=num_choices)
-        candidates.sort(key=self.evaluate_fitness, reverse=True)
-        return candidates[0]
+    def score(self, matrix):
+        if self.constraintHandling == 'penalty':
+            return self.problem.penalty_fitness_batch(matrix, self.penaltyFactor)
+        return self.problem.fitness_batch(matrix)
 
-    def random_selection(self):
-        return random.choice(self.population)
+    def repair_population(self):
+        # Sửa các cá thể vượt tải và ghi ngược vào quần thể
+        totals = (self.total_weights, self.total_values) if self.incrementalFitness else None
+        self.repair_individuals(self.population, totals)
 
-    def roulette_wheel_selection(self):
-        fitness_values = [self.evaluate_fitness(ind) for ind in self.population]
-        total_fitness = sum(fitness_values)
+    def repair_individuals(self, individuals, totals=None):
+        if self.representation == 'array':
+            self.problem.repair_batch(individuals, totals)
+            return
+        matrix = np.array(individuals)
+        for i in self.problem.repair_batch(matrix):
+            individuals[i] = matrix[i].tolist()
+
+    def evaluate_population(self, population):
+        # Một lần gọi tính fitness cho cả quần thể
+        if self.fitness_cache is None:
+            self.evaluations += len(population)
+            return self.score(population)
+
+        matrix = np.asarray(population)
+        keys = [row.tobytes() for row in matrix]
+        fitnesses = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.fitness_cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                fitnesses[i] = cached
+        if missing:
+            self.evaluations += len(missing)
+            fitnesses[missing] = self.score(matrix[missing])
+            for i in missing:
+                self.fitness_cache.put(keys[i], fitnesses[i])
+        return fitnesses
+
+    def diversity(self, population):
+        # Tỉ lệ bộ gen khác nhau trong quần thể
+        return 1.0 - len(self.duplicate_rows(population)) / len(population)
+
+    def duplicate_rows(self, population):
+        # Chỉ số các cá thể trùng bộ gen với một cá thể đứng trước nó.
+        # Mảng: mỗi hàng được xem như một khối bytes (np.void) nên np.unique so sánh cả hàng một lần
+        if isinstance(population, np.ndarray):
+            matrix = np.ascontiguousarray(population)
+            keys = matrix.view(np.dtype((np.void, matrix.dtype.itemsize * matrix.shape[1]))).ravel()
+            _, first = np.unique(keys, return_index=True)
+            duplicate = np.ones(len(matrix), dtype=bool)
+            duplicate[first] = False
+            return np.flatnonzero(duplicate)
+        seen = set()
+        duplicates = []
+        for index, individual in enumerate(population):
+            key = tuple(individual)
+            if key in seen:
+                duplicates.append(index)
+            seen.add(key)
+        return np.array(duplicates, dtype=np.intp)
+
+    def perturb_rows(self, rows):
+        # Thay các hàng bằng cá thể ngẫu nhiên mới hoặc đổi một gen ngẫu nhiên sang giá trị khác
+        num_genes = len(self.problem.weights)
+        max_quantities = self.problem.max_quantities
+        if self.duplicateReplacement == 'random':
+            fresh = self.rng.integers(0, max_quantities + 1, size=(len(rows), num_genes))
+        else:
+            cols = self.rng.integers(0, num_genes, size=len(rows))
+            limits = max_quantities[cols]
+            # Dịch 1..limit theo vòng (mod limit + 1) nên gen luôn đổi giá trị nếu limit > 0
+            shifts = 1 + (self.rng.random(len(rows)) * limits).astype(np.int64)
+
+        if self.representation == 'array':
+            if self.duplicateReplacement == 'random':
+                self.population[rows] = fresh
+            else:
+                self.population[rows, cols] = (self.population[rows, cols] + shifts) % (limits + 1)
+            if self.incrementalFitness:
+                self.total_weights[rows] = self.population[rows] @ self.problem.weights
+                self.total_values[rows] = self.population[rows] @ self.problem.values
+            return
+
+        for position, row in enumerate(rows):
+            if self.duplicateReplacement == 'random':
+                self.population[row] = fresh[position].tolist()
+            else:
+                individual = list(self.population[row])
+                col = cols[position]
+                individual[col] = int((individual[col] + shifts[position]) % (limits[position] + 1))
+                self.population[row] = individual
+
+    def deduplicate_population(self, duplicates):
+        # Thay các bản trùng, lặp lại tối đa DEDUPLICATE_PASSES lượt; trả về các hàng đã thay
+        changed = []
+        for _ in range(self.DEDUPLICATE_PASSES):
+            if len(duplicates) == 0:
+                break
+            self.perturb_rows(duplicates)
+            changed.append(duplicates)
+            duplicates = self.duplicate_rows(self.population)
+        changed = np.unique(np.concatenate(changed)) if changed else np.empty(0, dtype=np.intp)
+        self.logs.duplicates_replaced += len(changed)
+        return changed
+
+    def evaluate_rows(self, rows):
+        # Sửa (nếu cần) và tính lại fitness chỉ cho các hàng đã đổi
+        if self.representation == 'array':
+            subset = self.population[rows]
+            totals = (self.total_weights[rows], self.total_values[rows]) if self.incrementalFitness else None
+            fitnesses = self.evaluate_children(subset, totals)
+            self.population[rows] = subset
+            if totals is not None:
+                self.total_weights[rows], self.total_values[rows] = totals
+            return fitnesses
+        subset = [self.population[row] for row in rows]
+        fitnesses = self.evaluate_children(subset, None)
+        for row, individual in zip(rows, subset):
+            self.population[row] = individual
+        return fitnesses
+
+    def stop_reason(self, generation, population, start_time):
+        if self.targetFitness is not None and self.logs.best_fitness >= self.targetFitness:
+            return 'target'
+        if self.stagnationWindow and generation + 1 - self.logs.best_generation >= self.stagnationWindow:
+            return 'stagnation'
+        if self.timeLimit is not None and time.perf_counter() - start_time >= self.timeLimit:
+            return 'time_limit'
+        if self.maxEvaluations is not None and self.evaluations >= self.maxEvaluations:
+            return 'max_evaluations'
+        if self.diversityThreshold is not None and self.diversity(population) < self.diversityThreshold:
+            return 'diversity'
+        return None
+
+    def prepare_selection(self):
+        # Dựng phân phối tích luỹ cho roulette một lần mỗi thế hệ
+        self.cumulative_fitness = None
+        if self.selectionType == 'roulette':
+            # Fitness âm (chế độ phạt) được dời về 0 để xác suất không âm
+            cumulative = np.cumsum(self.fitnesses - min(self.fitnesses.min(initial=0.0), 0.0))
+            if len(cumulative) and cumulative[-1] > 0:
+                self.cumulative_fitness = cumulative
+
+    def select_parents(self, k, num_choices=None):
+        # Chọn k cha mẹ trong một lần gọi, trả về mảng chỉ số trong quần thể
+        if self.selectionType == 'tournament':
+            return self.tournament_indices(k, num_choices or self.tournamentSize)
+        elif self.selectionType == 'random':
+            return self.rng.integers(0, len(self.population), size=k)
+        elif self.selectionType == 'roulette':
+            return self.roulette_indices(k)
+        else:
+            raise ValueError("Phương pháp selection không hợp lệ. Chọn 'tournament', 'random' hoặc 'roulette'.")
 
-        if total_fitness == 0:
-            return random.choice(self.population)
+    def tournament_indices(self, k, num_choices):
+        # Ma trận ứng viên (k, num_choices), người thắng mỗi hàng chọn bằng argmax
+        candidates = self.rng.integers(0, len(self.population), size=(k, num_choices))
+        winners = np.argmax(self.fitnesses[candidates], axis=1)
+        return candidates[np.arange(k), winners]
 
-        probabilities = [f / total_fitness for f in fitness_values]
-        cumulative_probabilities = []
-        cumulative = 0
-        for p in probabilities:
-            cumulative += p
-            cumulative_probabilities.append(cumulative)
+    def tournament_selection(self, num_choices=None):
+        return self.population[self.tournament_indices(1, num_choices or self.tournamentSize)[0]]
+
+    def random_selection(self):
+        return self.random.choice(self.population)
 
-        r = random.random()
-        for i, cumulative_p in enumerate(cumulative_probabilities):
-            if r <= cumulative_p:
-                return self.population[i]
+    def roulette_indices(self, k):
+        if self.cumulative_fitness is None:
+            # Tổng fitness bằng 0 → chọn đều
+            return self.rng.integers(0, len(self.population), size=k)
+        r = self.rng.random(k) * self.cumulative_fitness[-1]
+        indices = np.searchsorted(self.cumulative_fitness, r, side='right')
+        return np.minimum(indices, len(self.population) - 1)
+
+    def roulette_wheel_selection(self):
+        return self.population[self.roulette_indices(1)[0]]
 
     def crossover(self, parent1, parent2):
+        # Các toán tử trên từng cá thể chỉ dùng cho biểu diễn list (offspring_list);
+        # quần thể mảng đi qua offspring_array và các toán tử *_batch
         if self.crossoverType == 'uniform':
             return self.uniform_crossover(parent1, parent2)
         elif self.crossoverType == 'one_point':
@@ -82,11 +411,11 @@ class GeneticAlgorithm:
             return parent1, parent2
 
     def one_point_crossover(self, parent1, parent2):
-        if len(self.problem.items) < 2:
+        if len(self.problem.weights) < 2:
         # Không thể cắt nếu có ít hơn 2 gene → giữ nguyên
             return parent1[:], parent2[:]
-        if random.random() < self.crossoverRate:
-            cut_point = random.randint(1, len(self.problem.items) - 1)
+        if self.random.random() < self.crossoverRate:
+            cut_point = self.random.randint(1, len(self.problem.weights) - 1)
             return (
                 parent1[:cut_point] + parent2[cut_point:],
                 parent2[:cut_point] + parent1[cut_point:]
@@ -94,21 +423,21 @@ class GeneticAlgorithm:
         return parent1, parent2
 
     def two_points_crossover(self, parent1, parent2):
-        if random.random() < self.crossoverRate:
-            point1 = random.randint(1, len(parent1) - 2)
-            point2 = random.randint(point1 + 1, len(parent1) - 1)
+        if self.random.random() < self.crossoverRate:
+            point1 = self.random.randint(1, len(parent1) - 2)
+            point2 = self.random.randint(point1 + 1, len(parent1) - 1)
             child1 = parent1[:point1] + parent2[point1:point2] + parent1[point2:]
             child2 = parent2[:point1] + parent1[point1:point2] + parent2[point2:]
             return child1, child2
         return parent1, parent2
 
     def uniform_crossover(self, parent1, parent2):
-        if random.random() > self.crossoverRate:
+        if self.random.random() > self.crossoverRate:
             return parent1, parent2  # không crossover thì giữ nguyên
-            
+
         child1, child2 = [], []
         for gene1, gene2 in zip(parent1, parent2):
-            if random.random() < 0.5:  # swap probability
+            if self.random.random() < 0.5:  # swap probability
                 child1.append(gene2)
                 child2.append(gene1)
             else:
@@ -116,6 +445,68 @@ class GeneticAlgorithm:
                 child2.append(gene2)
         return child1, child2
 
+    def crossover_batch(self, parents1, parents2):
+        # parents1, parents2: ma trận (số cặp, số vật phẩm) → hai ma trận con
+        return self.apply_crossover(parents1, parents2, self.crossover_plan(*parents1.shape))
+
+    def crossover_plan(self, num_pairs, num_genes):
+        # Mô tả phép lai cho cả lô: ('segment', starts, ends) - con 1 lấy đoạn [start, end) của cha 2,
+        # ('mask', swap) - tráo từng gen theo mặt nạ, None - giữ nguyên cha mẹ
+        if self.crossoverType == 'uniform':
+            return ('mask', self.uniform_swap_mask(num_pairs, num_genes))
+        elif self.crossoverType == 'one_point':
+            return ('segment',) + self.one_point_segments(num_pairs, num_genes)
+        elif self.crossoverType == 'two_points':
+            return ('segment',) + self.two_points_segments(num_pairs, num_genes)
+        else:
+            return None
+
+    def apply_crossover(self, parents1, parents2, plan):
+        if plan is None:
+            return parents1.copy(), parents2.copy()
+        if plan[0] == 'segment':
+            genes = np.arange(parents1.shape[1])
+            swap = (genes >= plan[1][:, None]) & (genes < plan[2][:, None])
+        else:
+            swap = plan[1]
+        return np.where(swap, parents2, parents1), np.where(swap, parents1, parents2)
+
+    def crossover_pairs(self, num_pairs):
+        # Mỗi cặp được lai với xác suất crossoverRate
+        return self.rng.random(num_pairs) < self.crossoverRate
+
+    def one_point_segments(self, num_pairs, num_genes):
+        if num_genes < 2:
+            return np.zeros(num_pairs, dtype=np.int64), np.zeros(num_pairs, dtype=np.int64)
+        cut_points = self.rng.integers(1, num_genes, size=num_pairs)
+        cut_points[~self.crossover_pairs(num_pairs)] = num_genes
+        return cut_points, np.full(num_pairs, num_genes)
+
+    def two_points_segments(self, num_pairs, num_genes):
+        if num_genes < 3:
+            return np.zeros(num_pairs, dtype=np.int64), np.zeros(num_pairs, dtype=np.int64)
+        points1 = self.rng.integers(1, num_genes - 1, size=num_pairs)
+        points2 = self.rng.integers(points1 + 1, num_genes)
+        skip = ~self.crossover_pairs(num_pairs)
+        points2[skip] = points1[skip]
+        return points1, points2
+
+    def uniform_swap_mask(self, num_pairs, num_genes):
+        swap = self.rng.random((num_pairs, num_genes)) < 0.5
+        swap &= self.crossover_pairs(num_pairs)[:, None]
+        return swap
+
+    def one_point_crossover_batch(self, parents1, parents2):
+        plan = ('segment',) + self.one_point_segments(*parents1.shape)
+        return self.apply_crossover(parents1, parents2, plan)
+
+    def two_points_crossover_batch(self, parents1, parents2):
+        plan = ('segment',) + self.two_points_segments(*parents1.shape)
+        return self.apply_crossover(parents1, parents2, plan)
+
+    def uniform_crossover_batch(self, parents1, parents2):
+        return self.apply_crossover(parents1, parents2, ('mask', self.uniform_swap_mask(*parents1.shape)))
+
     def mutate(self, individual):
         if self.mutationType == 'uniform':
             return self.uniform_mutate(individual)
@@ -124,62 +515,382 @@ class GeneticAlgorithm:
         else:
             return individual
 
+    def mutate_batch(self, children, totals=None):
+        # Đột biến tại chỗ trên ma trận con; totals = (tổng trọng lượng, tổng giá trị) của các hàng
+        # nếu có sẽ được cập nhật theo các gen thay đổi
+        if self.mutationType == 'uniform':
+            return self.uniform_mutate_batch(children, totals)
+        elif self.mutationType == 'scramble':
+            return self.scramble_mutate_batch(children, totals)
+        else:
+            return children
+
+    def uniform_mutation_sites(self, num_children, num_genes):
+        # Lấy mẫu số vị trí đột biến của từng cá thể, chi phí theo số đột biến kỳ vọng
+        counts = self.rng.binomial(num_genes, self.mutationRate, size=num_children)
+        rows = np.repeat(np.arange(num_children), counts)
+        cols = self.rng.integers(0, num_genes, size=len(rows))
+        # Bỏ vị trí bị chọn trùng để mỗi gen chỉ đột biến một lần
+        _, unique = np.unique(rows * num_genes + cols, return_index=True)
+        rows, cols = rows[unique], cols[unique]
+        return rows, cols, self.rng.integers(0, self.problem.max_quantities[cols] + 1)
+
+    def uniform_mutate_batch(self, children, totals=None):
+        rows, cols, values = self.uniform_mutation_sites(*children.shape)
+        if totals is not None:
+            delta = values - children[rows, cols]
+            np.add.at(totals[0], rows, delta * self.problem.weights[cols])
+            np.add.at(totals[1], rows, delta * self.problem.values[cols])
+        children[rows, cols] = values
+        return children
+
+    def scramble_orders(self, num_children, num_genes):
+        rows = np.flatnonzero(self.rng.random(num_children) < self.mutationRate)
+        if num_genes < 2 or len(rows) == 0:
+            return rows[:0], np.empty((0, num_genes), dtype=np.intp)
+        starts = self.rng.integers(0, num_genes - 1, size=len(rows))
+        ends = self.rng.integers(starts + 1, num_genes)
+        # Khoá sắp xếp: ngoài đoạn giữ nguyên chỉ số, trong đoạn là giá trị ngẫu nhiên
+        # trong [start, end + 1) nên argsort chỉ xáo trộn các gen trong đoạn
+        genes = np.arange(num_genes)
+        inside = (genes >= starts[:, None]) & (genes <= ends[:, None])
+        keys = np.where(
+            inside,
+            starts[:, None] + self.rng.random((len(rows), num_genes)) * (ends - starts + 1)[:, None],
+            genes
+        )
+        return rows, np.argsort(keys, axis=1, kind='stable')
+
+    def scramble_mutate_batch(self, children, totals=None):
+        rows, order = self.scramble_orders(*children.shape)
+        if len(rows) == 0:
+            return children
+        scrambled = np.take_along_axis(children[rows], order, axis=1)
+        if totals is not None:
+            delta = scrambled.astype(np.int64) - children[rows]
+            totals[0][rows] += delta @ self.problem.weights
+            totals[1][rows] += delta @ self.problem.values
+        children[rows] = scrambled
+        return children
+
     def uniform_mutate(self, individual):
         for i in range(len(individual)):
-            if random.random() < self.mutationRate:
-                individual[i] = random.randint(0, self.problem.items[i]['Max_quantity'])
+            if self.random.random() < self.mutationRate:
+                individual[i] = self.random.randint(0, int(self.problem.max_quantities[i]))
         return individual
 
     def scramble_mutate(self, individual):
-        if random.random() < self.mutationRate:
-            start = random.randint(0, len(individual) - 2)
-            end = random.randint(start + 1, len(individual) - 1)
+        if self.random.random() < self.mutationRate:
+            start = self.random.randint(0, len(individual) - 2)
+            end = self.random.randint(start + 1, len(individual) - 1)
             segment = individual[start:end + 1]
-            random.shuffle(segment)
+            self.random.shuffle(segment)
             individual[start:end + 1] = segment
         return individual
 
-    def run(self, log_callback=None):
-        self.initial_population()
-        population = self.population
+    def offspring_array(self, count):
+        # Sinh count con (chọn cha mẹ, lai, đột biến) thành ma trận mới;
+        # trả về (ma trận con, (tổng trọng lượng, tổng giá trị) của con hoặc None)
+        num_pairs = (count + 1) // 2
+        with self.phase('selection'):
+            parents = self.select_parents(2 * num_pairs)
+        index1, index2 = parents[0::2], parents[1::2]
+        totals = None
+        with self.phase('crossover'):
+            parents1, parents2 = self.population[index1], self.population[index2]
+            plan = self.crossover_plan(*parents1.shape)
+            children1, children2 = self.apply_crossover(parents1, parents2, plan)
+            children = np.empty((2 * num_pairs, self.population.shape[1]), dtype=self.population.dtype)
+            children[0::2] = children1
+            children[1::2] = children2
+            if self.incrementalFitness:
+                totals = self.crossover_totals(plan, index1, index2, parents1, children1)
+        with self.phase('mutation'):
+            self.mutate_batch(children, totals)
+        if totals is not None:
+            totals = (totals[0][:count], totals[1][:count])
+        return children[:count], totals
 
-        for generation in range(self.generations):
-            fitnesses = [self.evaluate_fitness(ind) for ind in population]
-            best_fitness     = max(fitnesses)
-            avg_fitness      = sum(fitnesses) / len(fitnesses)
-            worst_fitness    = min(fitnesses)
-            best_individual = copy.deepcopy(max(population, key=self.evaluate_fitness))
-
-            log = {
-                "generation"     : generation + 1,
-                "best"           : best_fitness,
-                "avg"            : avg_fitness,
-                "worst"          : worst_fitness,
-                "bestIndividual" : best_individual
-            }
-            self.logs.append(log)
-
-            if log_callback and (generation + 1) % 10 == 0: #callback này giống như 1 cách để gọi cập nhật biểu đồ song song với chạy thuật toán 
-                log_callback(log)
-
-            new_population = []
-            while len(new_population) < self.populationSize:
-                parent1 = self.selection()
-                parent2 = self.selection()
+    def offspring_list(self, count):
+        children = []
+        with self.phase('selection'):
+            parents = iter(self.select_parents(2 * ((count + 1) // 2)))
+        while len(children) < count:
+            parent1 = self.population[next(parents)]
+            parent2 = self.population[next(parents)]
+            with self.phase('crossover'):
                 child1, child2 = self.crossover(parent1, parent2)
+                # Không lai thì crossover trả lại chính cha mẹ; sao chép để đột biến
+                # không sửa cá thể còn nằm trong quần thể (hoặc cả hai con cùng một cha)
+                if child1 is parent1:
+                    child1 = child1[:]
+                if child2 is parent2:
+                    child2 = child2[:]
+            with self.phase('mutation'):
                 self.mutate(child1)
                 self.mutate(child2)
-                new_population.extend([child1, child2])
+            children.extend([child1, child2])
+        return children[:count]
+
+    def offspring(self, count):
+        if self.representation == 'array':
+            return self.offspring_array(count)
+        return self.offspring_list(count), None
+
+    def elite_indices(self, count=None):
+        # Chỉ số count cá thể tốt nhất (tốt nhất đứng đầu), argpartition thay vì sắp xếp cả quần thể
+        count = self.eliteSize if count is None else count
+        if count <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(self.fitnesses, len(self.fitnesses) - count)[-count:]
+        return top[np.argsort(self.fitnesses[top], kind='stable')[::-1]]
+
+    def evaluate_children(self, children, totals):
+        # Sửa (nếu cần) và tính fitness cho con mới sinh
+        if self.constraintHandling == 'repair':
+            with self.phase('repair'):
+                self.repair_individuals(children, totals)
+        with self.phase('evaluation'):
+            if totals is not None:
+                return self.evaluate_totals(totals)
+            return self.evaluate_population(children)
+
+    def breed_array(self):
+        # Thay toàn bộ quần thể: con ở các hàng đầu, eliteSize cá thể tốt nhất ở các hàng cuối
+        elites = self.elite_indices()
+        children, totals = self.offspring_array(self.populationSize - len(elites))
+        new_population = np.empty_like(self.population)
+        new_population[:len(children)] = children
+        new_population[len(children):] = self.population[elites]
+        if totals is not None:
+            self.total_weights = np.concatenate([totals[0], self.total_weights[elites]])
+            self.total_values = np.concatenate([totals[1], self.total_values[elites]])
+        return new_population
+
+    def steady_state_step(self):
+        # Thay tại chỗ offspringSize cá thể kém nhất (elite được loại khỏi danh sách bị thay)
+        children, totals = self.offspring(self.offspringSize)
+        fitnesses = self.evaluate_children(children, totals)
+        ranking = self.fitnesses.copy()
+        ranking[self.elite_indices()] = np.inf
+        worst = np.argpartition(ranking, len(children) - 1)[:len(children)]
+        if self.representation == 'array':
+            self.population[worst] = children
+            if totals is not None:
+                self.total_weights[worst] = totals[0]
+                self.total_values[worst] = totals[1]
+        else:
+            for row, child in zip(worst, children):
+                self.population[row] = child
+        self.fitnesses[worst] = fitnesses
+
+    def mu_plus_lambda_step(self):
+        # Gộp cha mẹ với con, giữ populationSize cá thể tốt nhất; eliteSize cha mẹ tốt nhất luôn được giữ
+        # kể cả khi có đủ con tốt hơn chúng (cha mẹ nằm ở các hàng đầu của mảng gộp)
+        children, totals = self.offspring(self.offspringSize)
+        fitnesses = np.concatenate([self.fitnesses, self.evaluate_children(children, totals)])
+        ranking = fitnesses.copy()
+        ranking[self.elite_indices()] = np.inf
+        keep = np.argpartition(ranking, len(ranking) - self.populationSize)[-self.populationSize:]
+        if self.representation == 'array':
+            self.population = np.concatenate([self.population, children])[keep]
+            if totals is not None:
+                self.total_weights = np.concatenate([self.total_weights, totals[0]])[keep]
+                self.total_values = np.concatenate([self.total_values, totals[1]])[keep]
+        else:
+            combined = self.population + children
+            self.population = [combined[index] for index in keep]
+        self.fitnesses = fitnesses[keep]
+
+    def compute_totals(self):
+        self.total_weights = self.population @ self.problem.weights
+        self.total_values = self.population @ self.problem.values
+
+    def crossed_pairs(self, plan, num_pairs):
+        # Chỉ số các cặp thật sự được lai (đoạn tráo khác rỗng hoặc mặt nạ có gen được tráo)
+        if plan is None:
+            return np.empty(0, dtype=np.intp)
+        if plan[0] == 'segment':
+            return np.flatnonzero(plan[2] > plan[1])
+        return np.flatnonzero(plan[1].any(axis=1))
+
+    def crossover_totals(self, plan, index1, index2, parents1, children1):
+        # Tổng trọng lượng / giá trị của con suy ra từ tổng của cha mẹ: con 1 chỉ khác cha 1 ở các gen
+        # được tráo, con 2 nhận phần chênh lệch ngược dấu. Chỉ tính chênh lệch cho các cặp được lai,
+        # trọng lượng và giá trị cùng một phép nhân với ma trận (số vật phẩm, 2)
+        delta = np.zeros((len(index1), 2))
+        crossed = self.crossed_pairs(plan, len(index1))
+        if len(crossed):
+            delta[crossed] = (children1[crossed] - parents1[crossed]) @ self.item_totals
+        num_children = 2 * len(index1)
+        result = []
+        for column, parent_totals in enumerate((self.total_weights, self.total_values)):
+            children = np.empty(num_children)
+            children[0:num_children:2] = parent_totals[index1] + delta[:, column]
+            children[1:num_children:2] = parent_totals[index2] - delta[:, column]
+            result.append(children)
+        return result
+
+    def evaluate_totals(self, totals=None):
+        total_weights, total_values = totals if totals is not None else (self.total_weights, self.total_values)
+        self.evaluations += len(total_weights)
+        if self.constraintHandling == 'penalty':
+            return self.problem.penalty_from_totals(total_weights, total_values, self.penaltyFactor)
+        return self.problem.fitness_from_totals(total_weights, total_values)
+
+    def emigrants(self, count):
+        # Bản sao count cá thể tốt nhất của quần thể vừa đánh giá cùng fitness của chúng
+        top = np.argsort(self.fitnesses, kind='stable')[::-1][:count]
+        if self.representation == 'array':
+            individuals = self.population[top].copy()
+        else:
+            individuals = [copy.deepcopy(self.population[index]) for index in top]
+        return individuals, self.fitnesses[top].copy()
+
+    def immigrate(self, individuals, fitnesses):
+        # Thay các cá thể kém nhất bằng cá thể nhập cư; fitness đi kèm nên không phải tính lại
+        count = min(len(individuals), len(self.population))
+        worst = np.argsort(self.fitnesses, kind='stable')[:count]
+        if self.representation == 'array':
+            self.population[worst] = np.asarray(individuals[:count], dtype=self.population.dtype)
+            if self.incrementalFitness:
+                self.total_weights[worst] = self.population[worst] @ self.problem.weights
+                self.total_values[worst] = self.population[worst] @ self.problem.values
+        else:
+            for row, individual in zip(worst, individuals):
+                self.population[row] = list(individual)
+        self.fitnesses[worst] = np.asarray(fitnesses[:count], dtype=np.float64)
+        self.prepare_selection()
+
+    def start(self):
+        # Khởi tạo quần thể và log; run() = start() + (evaluate_generation() + breed()) mỗi thế hệ + finish(),
+        # các bộ điều khiển khác (vd. mô hình đảo) gọi từng bước này trực tiếp
+        self.profiler = PhaseProfiler() if self.profile else None
+        self.phase = self.profiler.phase if self.profiler else no_phase
+        self.start_time = time.perf_counter()
+        with self.phase('initialization'):
+            self.initial_population()
+        self.logs = GenerationLog(self.generations, self.logMode, self.snapshotInterval)
+        self.evaluations = 0
+        self.evaluated = False
+
+    def evaluate_generation(self, generation):
+        # Sửa (nếu cần), đánh giá và ghi log quần thể hiện tại; trả về (bản sao cá thể tốt nhất, chỉ số)
+        phase = self.phase
+        if self.incrementalFitness and generation % self.TOTALS_RESYNC_INTERVAL == 0:
+            with phase('evaluation'):
+                self.compute_totals()
+
+        diversity = float('nan')
+        if self.deduplicate or self.trackDiversity:
+            with phase('diversity'):
+                duplicates = self.duplicate_rows(self.population)
+                diversity = 1.0 - len(duplicates) / len(self.population)
+                changed = self.deduplicate_population(duplicates) if self.deduplicate else duplicates[:0]
+            if self.evaluated and len(changed):
+                # Fitness của các hàng còn lại vẫn đúng, chỉ tính lại các hàng vừa thay
+                self.fitnesses[changed] = self.evaluate_rows(changed)
+
+        if not self.evaluated:
+            if self.constraintHandling == 'repair':
+                with phase('repair'):
+                    self.repair_population()
+
+            # Fitness tính đúng một lần mỗi thế hệ, các phép chọn đọc từ self.fitnesses
+            with phase('evaluation'):
+                if self.incrementalFitness:
+                    self.fitnesses = self.evaluate_totals()
+                else:
+                    self.fitnesses = self.evaluate_population(self.population)
+        fitnesses = self.fitnesses
+        with phase('statistics'):
+            self.prepare_selection()
+            best_index       = int(np.argmax(fitnesses))
+            best_fitness     = float(fitnesses[best_index])
+            avg_fitness      = float(fitnesses.mean())
+            worst_fitness    = float(fitnesses.min())
+        with phase('elitism'):
+            if self.representation == 'array':
+                best_individual = self.population[best_index].copy()
+            else:
+                best_individual = copy.deepcopy(self.population[best_index])
+
+        with phase('logging'):
+            self.logs.record(best_fitness, avg_fitness, worst_fitness, best_individual, diversity)
+        return best_individual, best_index
+
+    def breed(self):
+        # Sinh thế hệ kế tiếp từ quần thể đã đánh giá theo cách thay thế đã chọn
+        if self.replacement == 'steady_state':
+            self.steady_state_step()
+            self.evaluated = True
+            return
+        if self.replacement == 'mu_plus_lambda':
+            self.mu_plus_lambda_step()
+            self.evaluated = True
+            return
+
+        self.evaluated = False
+        if self.representation == 'array':
+            self.population = self.breed_array()
+            return
+
+        # Giữ lại eliteSize cá thể tốt nhất (elitism) theo self.fitnesses hiện tại, giống breed_array:
+        # sau immigrate() cá thể tốt nhất có thể là cá thể nhập cư chứ không phải best_individual đã ghi log
+        elites = [copy.deepcopy(self.population[index]) for index in self.elite_indices()]
+        new_population = self.offspring_list(self.populationSize - len(elites))
+
+        # Thêm các cá thể tốt nhất trở lại quần thể
+        self.population = new_population + elites
+
+    def finish(self):
+        self.logs.evaluations = self.evaluations
+        self.logs.elapsed = time.perf_counter() - self.start_time
+        if self.profiler:
+            self.logs.profile = self.profiler.report(self.logs.elapsed, self.evaluations)
+        return self.logs
+
+    def run(self, log_callback=None, progress_every=10, progress_seconds=None, cancel_event=None):
+        # log_callback được gọi mỗi progress_every thế hệ và/hoặc mỗi progress_seconds giây,
+        # cancel_event (vd. threading.Event) cho phép dừng giữa chừng và trả về kết quả dở dang
+        self.start()
+        last_progress = self.start_time
+        last_cancel_check = self.start_time - self.CANCEL_CHECK_SECONDS   # thế hệ đầu luôn hỏi
+        reported = 0
+
+        for generation in range(self.generations):
+            self.evaluate_generation(generation)
+
+            due = False
+            if log_callback: #callback này giống như 1 cách để gọi cập nhật biểu đồ song song với chạy thuật toán 
+                due = bool(progress_every) and (generation + 1) % progress_every == 0
+                if progress_seconds is not None and time.perf_counter() - last_progress >= progress_seconds:
+                    due = True
+                if due:
+                    with self.phase('progress'):
+                        log_callback(self.logs[generation])
+                    last_progress = time.perf_counter()
+                    reported = generation + 1
+
+            # Chỉ hỏi cancel_event khi vừa báo tiến độ hoặc đã quá CANCEL_CHECK_SECONDS từ lần hỏi trước
+            if cancel_event is not None:
+                now = time.perf_counter()
+                if due or now - last_cancel_check >= self.CANCEL_CHECK_SECONDS:
+                    last_cancel_check = now
+                    if cancel_event.is_set():
+                        self.logs.stop_reason = 'cancelled'
+                        break
 
-            # Giữ lại best cá thể để elitism
-            new_population = new_population[:self.populationSize - 1]
+            reason = self.stop_reason(generation, self.population, self.start_time)
+            if reason is not None:
+                self.logs.stop_reason = reason
+                break
 
-            # Thêm cá thể tốt nhất trở lại quần thể
-            self.population = new_population + [best_individual]
-            population = self.population  # Cập nhật lại population cho thế hệ sau
+            self.breed()
 
-            # new_population = new_population[:self.populationSize]
-            # self.population = new_population
-            # population = self.population  
+        self.finish()
 
-        return self.logs
\ No newline at end of file
+        # Luôn báo thế hệ cuối cùng để biểu đồ trực tiếp khớp với kết quả
+        if log_callback and len(self.logs) and reported != len(self.logs):
+            log_callback(self.logs[-1])
+        return self.logs
@@ -0,0 +1,153 @@
+import multiprocessing
+import time
+import traceback
+from queue import Empty
+import numpy as np
+from problem.genetic import GeneticAlgorithm
+from problem.knapsack import KnapsackProblem
+from problem.runner import run_seeds
+
+TOPOLOGIES = ('ring', 'fully_connected')
+
+
+def migration_targets(num_islands, topology='ring'):
+    # Danh sách đảo nhận cá thể di cư của từng đảo
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Topology không hợp lệ: {topology!r}. Chọn một trong {TOPOLOGIES}.")
+    if num_islands < 2:
+        return [[] for _ in range(num_islands)]
+    if topology == 'ring':
+        return [[(island + 1) % num_islands] for island in range(num_islands)]
+    return [[target for target in range(num_islands) if target != island] for island in range(num_islands)]
+
+
+def _receive(inbox, active_sources, epoch, pending):
+    # Chờ thư di cư của lượt epoch từ mọi đảo nguồn còn chạy; thư của lượt sau được giữ lại trong pending,
+    # thư có epoch None báo đảo nguồn đã dừng
+    while any(source not in pending.get(epoch, {}) for source in active_sources):
+        source, message_epoch, individuals, fitnesses = inbox.get()
+        if message_epoch is None:
+            active_sources.discard(source)
+        else:
+            pending.setdefault(message_epoch, {})[source] = (individuals, fitnesses)
+    arrivals = pending.pop(epoch, {})
+    return [arrivals[source] for source in sorted(arrivals)]
+
+
+def _run_island(island, handle, params, seed, migration_interval, migration_size, inboxes, targets, sources, results):
+    try:
+        ga = GeneticAlgorithm(KnapsackProblem.attach(handle), seed=seed, **params)
+        ga.start()
+        active_sources = set(sources)
+        pending = {}
+        epoch = 0
+        for generation in range(ga.generations):
+            ga.evaluate_generation(generation)
+            reason = ga.stop_reason(generation, ga.population, ga.start_time)
+            if reason is not None:
+                ga.logs.stop_reason = reason
+                break
+
+            # Di cư đồng bộ: gửi top-k cho các đảo đích rồi chờ đủ thư từ các đảo nguồn,
+            # nhờ vậy kết quả không phụ thuộc tốc độ của từng tiến trình
+            if migration_interval and (generation + 1) % migration_interval == 0 and generation + 1 < ga.generations:
+                individuals, fitnesses = ga.emigrants(migration_size)
+                for target in targets:
+                    inboxes[target].put((island, epoch, individuals, fitnesses))
+                arrivals = _receive(inboxes[island], active_sources, epoch, pending)
+                if arrivals:
+                    ga.immigrate(
+                        [individual for individuals, _ in arrivals for individual in individuals],
+                        np.concatenate([fitnesses for _, fitnesses in arrivals])
+                    )
+                epoch += 1
+
+            ga.breed()
+        results.put((island, ga.finish(), None))
+    except Exception:
+        results.put((island, None, traceback.format_exc()))
+    finally:
+        # Báo các đảo đích rằng đảo này đã dừng để chúng không chờ thêm
+        for target in targets:
+            inboxes[target].put((island, None, None, None))
+
+
+class IslandModel:
+    def __init__(self, problem, params, islands=4, topology='ring', migration_interval=10, migration_size=2):
+        # params: tham số GeneticAlgorithm của mỗi đảo (populationSize là kích thước một đảo).
+        # Mỗi migration_interval thế hệ, migration_size cá thể tốt nhất của mỗi đảo được gửi
+        # theo topology và thay các cá thể kém nhất ở đảo nhận
+        if islands < 1:
+            raise ValueError("Số đảo phải >= 1.")
+        if migration_size < 0 or migration_interval < 0:
+            raise ValueError("migration_interval và migration_size không được âm.")
+        # Kiểm tra tham số ngay ở tiến trình chính thay vì để từng đảo báo lỗi
+        GeneticAlgorithm(problem, **params)
+        self.problem = problem
+        self.params = params
+        self.islands = islands
+        self.topology = topology
+        self.targets = migration_targets(islands, topology)
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+
+    def run(self, seed=None):
+        # Mỗi đảo chạy trong một tiến trình riêng, mảng của bài toán dùng chung qua shared memory
+        sources = [[island for island in range(self.islands) if target in self.targets[island]]
+                   for target in range(self.islands)]
+        seeds = run_seeds(self.islands, seed)
+        handle, shared = self.problem.publish()
+        inboxes = [multiprocessing.Queue() for _ in range(self.islands)]
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_run_island,
+                args=(island, handle, self.params, seeds[island], self.migration_interval, self.migration_size,
+                      inboxes, self.targets[island], sources[island], results),
+                daemon=True
+            )
+            for island in range(self.islands)
+        ]
+        start_time = time.perf_counter()
+        logs = {}
+        try:
+            for process in processes:
+                process.start()
+            while len(logs) < self.islands:
+                try:
+                    island, island_logs, error = results.get(timeout=1.0)
+                except Empty:
+                    if any(process.exitcode not in (None, 0) for process in processes):
+                        raise RuntimeError("Một tiến trình đảo đã dừng bất thường.") from None
+                    continue
+                if error is not None:
+                    raise RuntimeError(f"Đảo {island} gặp lỗi:\n{error}")
+                logs[island] = island_logs
+            # Các đảo đã xong nhưng có thể còn thư di cư chưa ai đọc; đọc bỏ để tiến trình thoát được
+            while any(process.is_alive() for process in processes):
+                for inbox in inboxes:
+                    try:
+                        while True:
+                            inbox.get_nowait()
+                    except Empty:
+                        pass
+                for process in processes:
+                    process.join(timeout=0.05)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            shared.close()
+            shared.unlink()
+
+        island_logs = [logs[island] for island in range(self.islands)]
+        best_island = max(range(self.islands), key=lambda island: island_logs[island].best_fitness)
+        return {
+            "best_fitness": island_logs[best_island].best_fitness,
+            "best_individual": island_logs[best_island].best_individual,
+            "best_island": best_island,
+            "evaluations": sum(island.evaluations for island in island_logs),
+            "elapsed": time.perf_counter() - start_time,
+            "islands": island_logs
+        }
@@ -1,19 +1,270 @@
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+
 class KnapsackProblem:
+    # Giới hạn số ô (số mảnh sau khi tách nhị phân × (capacity + 1)) của bảng quy hoạch động
+    EXACT_MAX_CELLS = 200_000_000
+
     def __init__(self, items, capacity):
-        self.items = items
+        self._items = items
         self.capacity = capacity
+        self.names = None
 
-    def fitness(self, individual):
-        total_weight = 0
-        total_value = 0
+        # Mảng liên tục dựng một lần, dùng cho việc tính fitness theo lô
+        self.weights = np.array([item['weight'] for item in items], dtype=np.float64)
+        self.values = np.array([item['value'] for item in items], dtype=np.float64)
+        self.max_quantities = np.array([item['Max_quantity'] for item in items], dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, names, weights, values, max_quantities, capacity):
+        # Dựng bài toán trực tiếp từ các cột (vd. của problem.loader), danh sách dict items
+        # chỉ được tạo khi có chỗ cần tới
+        problem = cls.__new__(cls)
+        problem._items = None
+        problem.capacity = capacity
+        problem.names = None if names is None else np.asarray(names)
+        problem.weights = np.asarray(weights, dtype=np.float64)
+        problem.values = np.asarray(values, dtype=np.float64)
+        problem.max_quantities = np.asarray(max_quantities, dtype=np.int64)
+        return problem
+
+    def publish(self):
+        # Chép weights / values / max_quantities vào một khối multiprocessing.shared_memory để các
+        # tiến trình worker gắn vào theo tên thay vì nhận bản sao. Trả về (handle, khối nhớ);
+        # tiến trình tạo khối phải close() và unlink() khi không dùng nữa
+        size = len(self.weights)
+        shared = shared_memory.SharedMemory(create=True, size=max(3 * size * 8, 1))
+        weights, values, max_quantities = self.shared_arrays(shared.buf, size)
+        weights[:] = self.weights
+        values[:] = self.values
+        max_quantities[:] = self.max_quantities
+        del weights, values, max_quantities
+        return {"name": shared.name, "size": size, "capacity": self.capacity}, shared
+
+    @classmethod
+    def attach(cls, handle):
+        # Bài toán dùng trực tiếp bộ nhớ của khối đã publish, chỉ đọc
+        shared = shared_memory.SharedMemory(name=handle["name"])
+        arrays = cls.shared_arrays(shared.buf, handle["size"])
+        for array in arrays:
+            array.flags.writeable = False
+        problem = cls.from_arrays(None, *arrays, capacity=handle["capacity"])
+        # Giữ khối nhớ sống cùng bài toán
+        problem._shared_memory = shared
+        return problem
+
+    @staticmethod
+    def shared_arrays(buffer, size):
+        # Bố cục khối nhớ: weights (float64) | values (float64) | max_quantities (int64)
+        return (
+            np.ndarray(size, dtype=np.float64, buffer=buffer, offset=0),
+            np.ndarray(size, dtype=np.float64, buffer=buffer, offset=8 * size),
+            np.ndarray(size, dtype=np.int64, buffer=buffer, offset=16 * size)
+        )
 
-        for quantity, item in zip(individual, self.items):
-            total_weight += quantity*item['weight']
-            total_value += quantity*item['value']
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = [
+                {
+                    "number": i + 1,
+                    "name": str(self.names[i]) if self.names is not None else f"item_{i + 1}",
+                    "weight": float(self.weights[i]),
+                    "value": float(self.values[i]),
+                    "Max_quantity": int(self.max_quantities[i])
+                }
+                for i in range(len(self.weights))
+            ]
+        return self._items
+
+    def fitness(self, individual):
+        total_weight = float(np.dot(individual, self.weights))
+        total_value = float(np.dot(individual, self.values))
         if total_weight > self.capacity:
             return 0
-        return total_value         
-      
+        return total_value
+
+    def fitness_batch(self, population):
+        # population: ma trận (số cá thể, số vật phẩm) → vector fitness
+        population = np.asarray(population)
+        return self.fitness_from_totals(population @ self.weights, population @ self.values)
+
+    def fitness_from_totals(self, total_weights, total_values):
+        return np.where(total_weights > self.capacity, 0.0, total_values)
+
+    def penalty_fitness_batch(self, population, factor=1.0):
+        # Phạt theo mức vượt sức chứa thay vì trả về 0; hệ số phạt tính theo tỉ lệ
+        # giá trị / trọng lượng lớn nhất nên cá thể vượt tải khó thắng cá thể hợp lệ.
+        # Fitness có thể âm để vẫn phân biệt được các cá thể vượt tải nhiều hay ít
+        population = np.asarray(population)
+        return self.penalty_from_totals(population @ self.weights, population @ self.values, factor)
+
+    def penalty_from_totals(self, total_weights, total_values, factor=1.0):
+        excess = np.maximum(total_weights - self.capacity, 0.0)
+        ratios = self.ratios()
+        finite = ratios[np.isfinite(ratios)]
+        rate = factor * (finite.max() if len(finite) else 1.0)
+        return total_values - rate * excess
+
+    def repair_batch(self, population, totals=None):
+        # Bỏ dần các đơn vị có tỉ lệ giá trị / trọng lượng thấp nhất cho tới khi vừa túi.
+        # Sửa tại chỗ, trả về chỉ số các hàng đã sửa; totals = (tổng trọng lượng, tổng giá trị)
+        # nếu có thì được dùng thay cho việc tính lại và được cập nhật theo phần bị bỏ
+        total_weights = population @ self.weights if totals is None else totals[0]
+        rows = np.flatnonzero(total_weights > self.capacity)
+        if len(rows) == 0:
+            return rows
+
+        order = np.argsort(self.ratios(), kind='stable')
+        order = order[self.weights[order] > 0]
+        weights = self.weights[order]
+        genes = population[np.ix_(rows, order)].astype(np.int64)
+        excess = total_weights[rows] - self.capacity
+
+        # removed[r, k]: trọng lượng bỏ được nếu bỏ hết các vật phẩm order[:k + 1]
+        removed = np.cumsum(genes * weights, axis=1)
+        split = np.minimum((removed < excess[:, None]).sum(axis=1), len(order) - 1)
+        before = np.where(split > 0, removed[np.arange(len(rows)), split - 1], 0.0)
+        drop = np.ceil((excess - before) / weights[split] - 1e-9).astype(np.int64)
+
+        # Chỉ các cột order[:limit] thay đổi: bỏ hết phần trước split, bớt drop đơn vị ở cột split
+        limit = int(split.max()) + 1
+        positions = np.arange(limit)
+        index = np.arange(len(rows))
+        drop = np.minimum(drop, genes[index, split])
+        if totals is not None:
+            # Phần bị bỏ: trọng lượng đã có trong removed, giá trị chỉ cộng trên các cột bị bỏ hết
+            values = self.values[order[:limit]]
+            dropped_values = np.where(positions[:-1] < split[:, None], genes[:, :limit - 1], 0) @ values[:-1]
+            totals[0][rows] -= before + drop * weights[split]
+            totals[1][rows] -= dropped_values + drop * values[split]
+        changed = genes[:, :limit]
+        changed[positions < split[:, None]] = 0
+        changed[index, split] -= drop
+        population[np.ix_(rows, order[:limit])] = changed
+        return rows
+
+    def ratios(self):
+        # Tỉ lệ giá trị / trọng lượng, vật phẩm không trọng lượng có giá trị dương xếp đầu
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = self.values / self.weights
+        ratios[self.weights == 0] = np.inf
+        ratios[self.values <= 0] = -np.inf
+        return ratios
+
+    def greedy_solution(self, ratios=None):
+        # Lấy tối đa từng vật phẩm theo thứ tự tỉ lệ giảm dần, miễn là còn vừa túi
+        ratios = self.ratios() if ratios is None else ratios
+        order = np.argsort(-ratios, kind='stable')
+        individual = np.zeros(len(self.weights), dtype=np.int64)
+        remaining = float(self.capacity)
+        weights = self.weights.tolist()
+        max_quantities = self.max_quantities.tolist()
+        values = self.values.tolist()
+        for index in order.tolist():
+            if values[index] <= 0:
+                break
+            weight = weights[index]
+            quantity = max_quantities[index] if weight == 0 else min(max_quantities[index], int(remaining // weight))
+            if quantity > 0:
+                individual[index] = quantity
+                remaining -= quantity * weight
+        return individual
+
+    def randomized_greedy_solution(self, rng, noise=0.3):
+        # Greedy với tỉ lệ bị nhiễu nhân ngẫu nhiên trong [1 - noise, 1 + noise]
+        ratios = self.ratios() * rng.uniform(1 - noise, 1 + noise, size=len(self.weights))
+        return self.greedy_solution(ratios)
+
+    def lp_bound(self):
+        # Nới lỏng tuyến tính (cho phép lấy phân số): lấy đủ theo tỉ lệ giảm dần, vật phẩm
+        # bị cắt lấy một phần → cận trên của lời giải tối ưu
+        ratios = self.ratios()
+        order = np.argsort(-ratios, kind='stable')
+        order = order[self.values[order] > 0]
+        full_weights = self.weights[order] * self.max_quantities[order]
+        cumulative = np.cumsum(full_weights)
+        quantities = np.zeros(len(self.weights))
+
+        fits = cumulative <= self.capacity
+        quantities[order[fits]] = self.max_quantities[order[fits]]
+        if not fits.all():
+            split = int(np.argmin(fits))
+            used = cumulative[split - 1] if split > 0 else 0.0
+            quantities[order[split]] = (self.capacity - used) / self.weights[order[split]]
+        return {
+            "value": float(quantities @ self.values),
+            "quantities": quantities
+        }
+
+    def split_items(self):
+        # Tách nhị phân Max_quantity: q = 1 + 2 + 4 + ... + phần dư,
+        # mỗi mảnh là một vật phẩm 0/1 với (chỉ số vật phẩm, số lượng)
+        item_indices, counts = [], []
+        for index, max_quantity in enumerate(self.max_quantities):
+            remaining = int(max_quantity)
+            count = 1
+            while remaining > 0:
+                take = min(count, remaining)
+                item_indices.append(index)
+                counts.append(take)
+                remaining -= take
+                count *= 2
+        return np.array(item_indices, dtype=np.intp), np.array(counts, dtype=np.int64)
+
+    def solve_exact(self, max_cells=None):
+        # Lời giải tối ưu bằng quy hoạch động theo sức chứa (chỉ khi trọng lượng là số nguyên)
+        max_cells = max_cells or self.EXACT_MAX_CELLS
+        if not np.all(self.weights == np.round(self.weights)) or np.any(self.weights < 0):
+            raise ValueError("Lời giải chính xác chỉ hỗ trợ trọng lượng là số nguyên không âm.")
+        if self.capacity < 0:
+            raise ValueError("Sức chứa phải không âm.")
+
+        start = time.perf_counter()
+        capacity = int(self.capacity)
+        individual = np.zeros(len(self.weights), dtype=np.int64)
+
+        # Vật phẩm không có trọng lượng và có giá trị dương luôn được lấy tối đa
+        free = (self.weights == 0) & (self.values > 0)
+        individual[free] = self.max_quantities[free]
+
+        item_indices, counts = self.split_items()
+        useful = (self.weights[item_indices] > 0) & (self.values[item_indices] > 0)
+        item_indices, counts = item_indices[useful], counts[useful]
+        piece_weights = (self.weights[item_indices] * counts).astype(np.int64)
+        piece_values = self.values[item_indices] * counts
+
+        cells = len(item_indices) * (capacity + 1)
+        if cells > max_cells:
+            raise ValueError(
+                f"Bài toán quá lớn cho lời giải chính xác: {cells} ô > giới hạn {max_cells}."
+            )
+
+        # dp[c] = giá trị tốt nhất với tổng trọng lượng <= c; taken[k, c] đánh dấu mảnh k được lấy
+        dp = np.zeros(capacity + 1)
+        taken = np.zeros((len(item_indices), capacity + 1), dtype=bool)
+        for k, (weight, value) in enumerate(zip(piece_weights, piece_values)):
+            if weight > capacity:
+                continue
+            candidate = dp[:capacity + 1 - weight] + value
+            better = candidate > dp[weight:]
+            taken[k, weight:] = better
+            dp[weight:] = np.where(better, candidate, dp[weight:])
+
+        c = capacity
+        for k in range(len(item_indices) - 1, -1, -1):
+            if taken[k, c]:
+                individual[item_indices[k]] += counts[k]
+                c -= piece_weights[k]
 
-     
+        return {
+            "value": float(individual @ self.values),
+            "weight": float(individual @ self.weights),
+            "individual": individual,
+            "time": time.perf_counter() - start,
+            "memory": dp.nbytes + taken.nbytes,
+            "cells": cells
+        }
 
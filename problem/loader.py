@@ -0,0 +1,131 @@
+import csv
+import os
+import numpy as np
+from problem.knapsack import KnapsackProblem
+
+REQUIRED_COLUMNS = ('name', 'weight', 'value', 'Max_quantity')
+
+# Các mảng lưu trong file cache .npz cạnh file gốc
+CACHE_ARRAYS = ('names', 'weights', 'values', 'max_quantities')
+
+
+def cache_path(path):
+    return path + '.npz'
+
+
+def read_table(path):
+    # Đọc file gốc thành {tên cột: dãy giá trị}
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            rows = list(reader)
+        rows = [row for row in rows if row]
+        bad = [line for line, row in enumerate(rows, start=1) if len(row) != len(header)]
+        if bad:
+            raise ValueError(f"Số cột không khớp tiêu đề ở các dòng {bad[:5]}")
+        # Chuyển hàng thành cột một lần
+        columns = list(zip(*rows)) or [()] * len(header)
+        return dict(zip(header, columns))
+    if extension in ('.xlsx', '.xls', '.parquet'):
+        # pandas chỉ được import khi thật sự đọc Excel / Parquet
+        import pandas as pd
+        df = pd.read_parquet(path) if extension == '.parquet' else pd.read_excel(path)
+        return {column: df[column].to_numpy() for column in df.columns}
+    raise ValueError(f"Định dạng file không được hỗ trợ: {extension}")
+
+
+def numeric_column(table, column):
+    try:
+        array = np.asarray(table[column], dtype=np.float64)
+    except ValueError:
+        raise ValueError(f"Cột {column!r} phải chứa số.") from None
+    bad = np.flatnonzero(~np.isfinite(array))
+    if len(bad):
+        raise ValueError(f"Cột {column!r} có giá trị thiếu hoặc không hợp lệ ở các dòng {(bad[:5] + 1).tolist()}")
+    return array
+
+
+def validate_columns(table):
+    # Kiểm tra cả cột một lần thay vì từng dòng; số dòng báo lỗi tính từ 1 (không kể tiêu đề)
+    missing = [column for column in REQUIRED_COLUMNS if column not in table]
+    if missing:
+        raise ValueError(f"File phải chứa các cột: {missing}")
+
+    weights = numeric_column(table, 'weight')
+    values = numeric_column(table, 'value')
+    quantities = numeric_column(table, 'Max_quantity')
+
+    bad = np.flatnonzero(weights < 0)
+    if len(bad):
+        raise ValueError(f"Trọng lượng không được âm (dòng {(bad[:5] + 1).tolist()})")
+    bad = np.flatnonzero((quantities < 0) | (quantities != np.floor(quantities)))
+    if len(bad):
+        raise ValueError(f"Max_quantity phải là số nguyên không âm (dòng {(bad[:5] + 1).tolist()})")
+
+    return {
+        "names": np.asarray(table['name']).astype(str),
+        "weights": weights,
+        "values": values,
+        "max_quantities": quantities.astype(np.int64)
+    }
+
+
+def read_cache(path):
+    # Cache chỉ dùng được khi được ghi từ đúng phiên bản hiện tại của file gốc.
+    # File cache hỏng hoặc không phải do loader ghi (BadZipFile, EOFError, ...) cũng chỉ coi như chưa có cache
+    try:
+        stat = os.stat(path)
+        with np.load(cache_path(path), allow_pickle=False) as cached:
+            if int(cached['source_size']) != stat.st_size or int(cached['source_mtime']) != stat.st_mtime_ns:
+                return None
+            return {name: cached[name] for name in CACHE_ARRAYS}
+    except Exception:
+        return None
+
+
+def write_cache(path, columns):
+    # Ghi vào file tạm rồi đổi tên để tiến trình khác không đọc phải file ghi dở;
+    # thư mục chỉ đọc thì bỏ qua, cache chỉ để tăng tốc
+    stat = os.stat(path)
+    temporary = cache_path(path) + '.tmp.npz'
+    try:
+        np.savez(temporary, source_size=stat.st_size, source_mtime=stat.st_mtime_ns, **columns)
+        os.replace(temporary, cache_path(path))
+    except OSError:
+        # Không để lại file tạm ghi dở
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def load_columns(path, cache=True):
+    # Đọc vật phẩm thành các cột numpy (names, weights, values, max_quantities).
+    # Lần đọc đầu ghi cache .npz cạnh file gốc, các lần sau đọc thẳng từ cache
+    if path.lower().endswith('.npz'):
+        with np.load(path, allow_pickle=False) as cached:
+            missing = [name for name in CACHE_ARRAYS if name not in cached]
+            if missing:
+                raise ValueError(f"File .npz phải chứa các mảng: {missing}")
+            return {name: cached[name] for name in CACHE_ARRAYS}
+
+    if cache:
+        columns = read_cache(path)
+        if columns is not None:
+            return columns
+
+    columns = validate_columns(read_table(path))
+    if cache:
+        write_cache(path, columns)
+    return columns
+
+
+def load_problem(path, capacity, cache=True):
+    return KnapsackProblem.from_arrays(capacity=capacity, **load_columns(path, cache))
+
+
+def load_items(path, cache=True):
+    # Danh sách dict như trước cho các giao diện cần sửa từng vật phẩm
+    return load_problem(path, capacity=0, cache=cache).items
@@ -0,0 +1,115 @@
+import bisect
+import copy
+import numpy as np
+
+LOG_MODES = ('full', 'improvement', 'minimal')
+
+
+class GenerationLog:
+    # Nhật ký gọn của một lần chạy: best/avg/worst trong mảng cấp phát sẵn,
+    # bộ gen tốt nhất chỉ được lưu lại khi cần.
+    #   full        - lưu cá thể tốt nhất ở mọi thế hệ
+    #   improvement - chỉ lưu khi best được cải thiện hoặc mỗi snapshot_interval thế hệ
+    #   minimal     - chỉ giữ thống kê và lời giải tốt nhất toàn cục
+    # Vẫn dùng được như list các dict {"generation", "best", "avg", "worst", "diversity", "bestIndividual"}.
+    def __init__(self, generations, mode='improvement', snapshot_interval=0):
+        if mode not in LOG_MODES:
+            raise ValueError("Chế độ log không hợp lệ. Chọn 'full', 'improvement' hoặc 'minimal'.")
+        self.mode = mode
+        self.snapshot_interval = snapshot_interval
+        self.size = 0
+        self._best = np.empty(generations)
+        self._avg = np.empty(generations)
+        self._worst = np.empty(generations)
+        # Tỉ lệ bộ gen khác nhau mỗi thế hệ, NaN nếu không theo dõi
+        self._diversity = np.full(generations, np.nan)
+        self.snapshot_generations = []
+        self.snapshots = []
+        self.best_fitness = float('-inf')
+        self.best_individual = None
+        self.best_generation = 0
+        self.stop_reason = 'completed'
+        self.evaluations = 0
+        self.elapsed = 0.0
+        # Báo cáo đo theo pha (GeneticAlgorithm(profile=True)), None nếu không bật
+        self.profile = None
+        # Số bộ gen trùng đã được thay (GeneticAlgorithm(deduplicate=True))
+        self.duplicates_replaced = 0
+
+    @property
+    def best(self):
+        return self._best[:self.size]
+
+    @property
+    def avg(self):
+        return self._avg[:self.size]
+
+    @property
+    def worst(self):
+        return self._worst[:self.size]
+
+    @property
+    def diversity(self):
+        return self._diversity[:self.size]
+
+    def record(self, best, avg, worst, best_individual, diversity=float('nan')):
+        if self.size == len(self._best):
+            # Chạy quá số thế hệ dự kiến → nới mảng gấp đôi
+            extra = max(len(self._best), 1)
+            self._best = np.concatenate((self._best, np.empty(extra)))
+            self._avg = np.concatenate((self._avg, np.empty(extra)))
+            self._worst = np.concatenate((self._worst, np.empty(extra)))
+            self._diversity = np.concatenate((self._diversity, np.full(extra, np.nan)))
+
+        index = self.size
+        self._best[index] = best
+        self._avg[index] = avg
+        self._worst[index] = worst
+        self._diversity[index] = diversity
+        self.size += 1
+
+        improved = best > self.best_fitness
+        if improved:
+            self.best_fitness = best
+            self.best_individual = copy.copy(best_individual)
+            self.best_generation = index + 1
+
+        if self.mode == 'minimal':
+            return
+        on_interval = self.snapshot_interval > 0 and (index + 1) % self.snapshot_interval == 0
+        if self.mode == 'full' or improved or on_interval:
+            self.snapshot_generations.append(index)
+            self.snapshots.append(self.best_individual if improved else copy.copy(best_individual))
+
+    def individual_at(self, index):
+        # Bộ gen đã lưu gần nhất tính đến thế hệ index
+        if self.mode == 'minimal':
+            return self.best_individual if index + 1 >= self.best_generation else None
+        position = bisect.bisect_right(self.snapshot_generations, index) - 1
+        return self.snapshots[position] if position >= 0 else None
+
+    def entry(self, index):
+        return {
+            "generation": index + 1,
+            "best": float(self._best[index]),
+            "avg": float(self._avg[index]),
+            "worst": float(self._worst[index]),
+            "diversity": None if np.isnan(self._diversity[index]) else float(self._diversity[index]),
+            "bestIndividual": self.individual_at(index)
+        }
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("Chỉ số thế hệ vượt quá số thế hệ đã ghi.")
+        return self.entry(index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self.entry(index)
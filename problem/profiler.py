@@ -0,0 +1,60 @@
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+# Dùng chung khi không bật đo: không tạo đối tượng mới, không gọi đồng hồ
+_NO_PHASE = nullcontext()
+
+
+def no_phase(name):
+    return _NO_PHASE
+
+
+class PhaseProfiler:
+    # Cộng dồn thời gian, số lần gọi và số khối bộ nhớ cấp phát (sys.getallocatedblocks) theo từng pha
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.blocks = {}
+
+    @contextmanager
+    def phase(self, name):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.blocks[name] = self.blocks.get(name, 0) + sys.getallocatedblocks() - blocks
+
+    def report(self, elapsed=None, evaluations=None):
+        # Báo cáo dạng dict để gắn vào kết quả chạy; pha tốn thời gian nhất đứng đầu
+        phases = {
+            name: {
+                "seconds": self.seconds[name],
+                "calls": self.calls[name],
+                "allocated_blocks": self.blocks[name]
+            }
+            for name in sorted(self.seconds, key=self.seconds.get, reverse=True)
+        }
+        report = {"phases": phases, "evaluations": evaluations, "elapsed": elapsed}
+        if elapsed:
+            # Phần thời gian không thuộc pha nào (vòng lặp, kiểm tra điều kiện dừng, ...)
+            report["unaccounted"] = elapsed - sum(self.seconds.values())
+        return report
+
+
+def format_profile(report):
+    # Bảng văn bản để in ra terminal
+    lines = [f"{'phase':<14} {'seconds':>10} {'share':>7} {'calls':>9} {'blocks':>10}"]
+    total = report.get("elapsed") or sum(phase["seconds"] for phase in report["phases"].values()) or 1.0
+    for name, phase in report["phases"].items():
+        lines.append(
+            f"{name:<14} {phase['seconds']:>10.4f} {phase['seconds'] / total:>7.1%} "
+            f"{phase['calls']:>9} {phase['allocated_blocks']:>10}"
+        )
+    if "unaccounted" in report:
+        lines.append(f"{'(other)':<14} {report['unaccounted']:>10.4f} {report['unaccounted'] / total:>7.1%}")
+    lines.append(f"evaluations: {report['evaluations']}, elapsed: {report['elapsed']:.4f}s")
+    return "\n".join(lines)
@@ -0,0 +1,108 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from problem.genetic import GeneticAlgorithm
+from problem.knapsack import KnapsackProblem
+
+# Bài toán của tiến trình worker, gửi một lần qua initializer thay vì theo từng task
+_worker_problem = None
+
+
+def _init_worker(problem, shared=False):
+    # shared=True: problem là handle của KnapsackProblem.publish, worker gắn vào khối nhớ chung
+    global _worker_problem
+    _worker_problem = KnapsackProblem.attach(problem) if shared else problem
+
+
+def _run_once(run_index, params, seed, best_only=False, progress_queue=None, run_options=None):
+    ga = GeneticAlgorithm(_worker_problem, seed=seed, **params)
+
+    progress = None
+    if progress_queue is not None:
+        # Chỉ gửi các số thống kê, không gửi bộ gen qua hàng đợi
+        def progress(entry):
+            progress_queue.put((run_index, entry["generation"], entry["best"], entry["avg"], entry["worst"]))
+
+    logs = ga.run(progress, **(run_options or {}))
+    if best_only:
+        # Chỉ gửi về fitness tốt nhất để giảm chi phí truyền giữa các tiến trình
+        return run_index, logs.best_fitness
+    return run_index, logs
+
+
+def run_seeds(runs, seed=None):
+    # Luồng ngẫu nhiên độc lập cho từng lần chạy, tách từ seed gốc bằng SeedSequence.spawn
+    # nên kết quả mỗi lần chạy không phụ thuộc số worker hay thứ tự hoàn thành
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return root.spawn(runs)
+
+
+class MultiRunExecutor:
+    def __init__(self, problem, workers=None, shared=True):
+        # shared=True: mảng của bài toán được đặt trong shared memory, worker chỉ nhận handle
+        # nên bộ nhớ mỗi worker không tăng theo kích thước danh mục vật phẩm
+        self.problem = problem
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = shared
+        self.shared_memory = None
+        self.pool = None
+        self.manager = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def start(self):
+        if self.pool is None:
+            initargs = (self.problem,)
+            if self.shared:
+                handle, self.shared_memory = self.problem.publish()
+                initargs = (handle, True)
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=initargs
+            )
+        return self.pool
+
+    def shutdown(self, cancel_pending=False):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=cancel_pending)
+            self.pool = None
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+        if self.manager is not None:
+            self.manager.shutdown()
+            self.manager = None
+
+    def progress_channel(self):
+        # Hàng đợi tiến độ và cờ huỷ dùng chung được giữa tiến trình chính và các worker
+        if self.manager is None:
+            self.manager = multiprocessing.Manager()
+        return self.manager.Queue(), self.manager.Event()
+
+    def run_many(self, param_sets, seed=None, best_only=False, progress_queue=None, **run_options):
+        # param_sets: danh sách tham số GeneticAlgorithm cho từng lần chạy
+        # run_options (progress_every, progress_seconds, cancel_event) được chuyển cho GeneticAlgorithm.run,
+        # tiến độ gửi về progress_queue dạng (chỉ số lần chạy, thế hệ, best, avg, worst)
+        # Trả về (chỉ số lần chạy, logs) theo thứ tự hoàn thành
+        pool = self.start()
+        seeds = run_seeds(len(param_sets), seed)
+        futures = [
+            pool.submit(_run_once, run_index, params, seeds[run_index], best_only, progress_queue, run_options)
+            for run_index, params in enumerate(param_sets)
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def repeat(self, params, runs, seed=None, best_only=False, progress_queue=None, **run_options):
+        return self.run_many([params] * runs, seed, best_only, progress_queue, **run_options)
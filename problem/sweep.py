@@ -0,0 +1,67 @@
+import itertools
+import numpy as np
+from problem.runner import MultiRunExecutor
+
+
+def parameter_grid(grid):
+    # grid: {tên tham số: danh sách giá trị} → tích Descartes của các giá trị
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def summarize_runs(best_fitnesses, threshold_factor=1.1):
+    # Thống kê trên fitness tốt nhất của các lần chạy cùng một ô tham số
+    best_fitnesses = np.asarray(best_fitnesses, dtype=np.float64)
+    mean = float(best_fitnesses.mean())
+    return {
+        "runs": len(best_fitnesses),
+        "mean": mean,
+        "std": float(best_fitnesses.std()),
+        "min": float(best_fitnesses.min()),
+        "max": float(best_fitnesses.max()),
+        "threshold": mean * threshold_factor,
+        "count_over_threshold": int((best_fitnesses > mean * threshold_factor).sum())
+    }
+
+
+class ParameterSweep:
+    def __init__(self, problem, base_params, runs=1, workers=None, threshold_factor=1.1):
+        # base_params: tham số GeneticAlgorithm cố định, grid sẽ ghi đè lên
+        # Khoá 'runs' trong grid (nếu có) thay đổi số lần chạy của từng ô
+        if runs < 1:
+            raise ValueError("Số lần chạy phải >= 1.")
+        self.problem = problem
+        self.base_params = base_params
+        self.runs = runs
+        self.workers = workers
+        self.threshold_factor = threshold_factor
+
+    def run(self, grid, seed=None):
+        # Mọi cặp (ô tham số, lần chạy) được chạy song song,
+        # trả về (ô tham số, thống kê) ngay khi ô đó có đủ kết quả
+        cells = parameter_grid(grid)
+        param_sets = []
+        task_cells = []
+        # Số kết quả còn chờ của từng ô, ô có 0 lần chạy sẽ không bao giờ được trả về nên bị từ chối
+        remaining = []
+        for cell_index, cell in enumerate(cells):
+            params = {**self.base_params, **cell}
+            runs = params.pop("runs", self.runs)
+            if runs < 1:
+                raise ValueError(f"Số lần chạy phải >= 1 (ô {cell}).")
+            param_sets.extend([params] * runs)
+            task_cells.extend([cell_index] * runs)
+            remaining.append(runs)
+
+        results = [[] for _ in cells]
+
+        with MultiRunExecutor(self.problem, self.workers) as executor:
+            for task_index, best_fitness in executor.run_many(param_sets, seed, best_only=True):
+                cell_index = task_cells[task_index]
+                results[cell_index].append(best_fitness)
+                remaining[cell_index] -= 1
+                if remaining[cell_index] == 0:
+                    yield cells[cell_index], summarize_runs(results[cell_index], self.threshold_factor)
+
+    def run_all(self, grid, seed=None):
+        return list(self.run(grid, seed))
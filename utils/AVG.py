@@ -1,11 +1,11 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import pandas as pd
 import random
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from problem.knapsack import KnapsackProblem
-from problem.genetic import GeneticAlgorithm
+from problem.runner import MultiRunExecutor
+from problem.loader import load_items
 import threading
 
 
@@ -87,21 +87,12 @@ class GAApp:
         tk.Button(self.root, text="📈 Mở Biểu Đồ Rộng", command=self.open_fullscreen_plot).pack(pady=5)
 
     def load_excel(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
+        file_path = filedialog.askopenfilename(filetypes=[("Item files", "*.xlsx *.xls *.csv *.parquet")])
         if not file_path:
             return
         try:
-            df = pd.read_excel(file_path)
-            self.products.clear()
-            for _, row in df.iterrows():
-                number = len(self.products) + 1
-                self.products.append({
-                    "number": number,
-                    "name": row["name"],
-                    "weight": float(row["weight"]),
-                    "value": float(row["value"]),
-                    "Max_quantity": int(row["Max_quantity"])
-                })
+            # Đọc theo cột và dùng cache .npz cạnh file cho các lần tải sau
+            self.products = load_items(file_path)
 
             self.product_table.delete(1.0, tk.END)
             for item in self.products:
@@ -151,8 +142,8 @@ class GAApp:
             return
 
         params = base_params.copy()
-        results = []
-        run_numbers = []
+        param_sets = []
+        labels = []
 
         for run in range(1, runs + 1):
             label_info = ""
@@ -172,23 +163,30 @@ class GAApp:
                     params["mutation_rate"] = self.modify_value(params["mutation_rate"], mode, 0.01, 1.0, run - 1)
                     label_info = f" | Mutation Rate: {params['mutation_rate']:.2f}"
 
-            ga = GeneticAlgorithm(
-                self.problem,
-                params["pop_size"],
-                params["generations"],
-                self.comboboxes["Crossover Type"].get(),
-                self.comboboxes["Selection Type"].get(),
-                self.comboboxes["Mutation Type"].get(),
-                params["crossover_rate"],
-                params["mutation_rate"]
-            )
-            logs = ga.run()
-            best_fitness = max(float(log["best"]) for log in logs)
-
-            results.append(best_fitness)
-            run_numbers.append(run)
-            self.log_text.insert(tk.END, f"[Run {run}]{label_info} → Best fitness = {best_fitness}\n")
-            self.log_text.see(tk.END)
+            param_sets.append({
+                "populationSize": params["pop_size"],
+                "generations": params["generations"],
+                "crossoverType": self.comboboxes["Crossover Type"].get(),
+                "selectionType": self.comboboxes["Selection Type"].get(),
+                "mutationType": self.comboboxes["Mutation Type"].get(),
+                "crossoverRate": params["crossover_rate"],
+                "mutationRate": params["mutation_rate"],
+                "logMode": "minimal"
+            })
+            labels.append(label_info)
+
+        # Các lần chạy độc lập chạy song song, kết quả trả về theo thứ tự hoàn thành;
+        # chỉ cần fitness tốt nhất nên worker không gửi cả log về
+        results_by_run = {}
+        with MultiRunExecutor(self.problem) as executor:
+            for run_index, best_fitness in executor.run_many(param_sets, best_only=True):
+                run = run_index + 1
+                results_by_run[run] = best_fitness
+                self.log_text.insert(tk.END, f"[Run {run}]{labels[run_index]} → Best fitness = {best_fitness}\n")
+                self.log_text.see(tk.END)
+
+        run_numbers = sorted(results_by_run)
+        results = [results_by_run[run] for run in run_numbers]
 
         self.ax.plot(run_numbers, results, label="Best Fitness", linewidth=2.0, marker='o', color='blue')
         self.ax.set_title("Best Fitness qua các lần chạy")
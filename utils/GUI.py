@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
 import platform
 from matplotlib.ticker import MaxNLocator
 import time
+import threading
+from queue import Empty
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from problem.genetic import GeneticAlgorithm
 from problem.knapsack import KnapsackProblem
+from problem.runner import MultiRunExecutor
+from problem.loader import load_items
 
 
 class KnapsackUI:
@@ -194,20 +196,14 @@ class KnapsackUI:
             messagebox.showwarning("Chọn dòng", "Vui lòng chọn sản phẩm để xoá.")
 
     def import_excel(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
+        file_path = filedialog.askopenfilename(filetypes=[("Item files", "*.xlsx *.xls *.csv *.parquet")])
         if not file_path:
             return
         try:
-            df = pd.read_excel(file_path)
-            for _, row in df.iterrows():
-                number = len(self.products) + 1
-                self.products.append({
-                    "number": number,
-                    "name": row["name"],
-                    "weight": float(row["weight"]),
-                    "value": float(row["value"]),
-                    "Max_quantity": int(row["Max_quantity"])
-                })
+            # Đọc theo cột và dùng cache .npz cạnh file cho các lần tải sau
+            for item in load_items(file_path):
+                item["number"] = len(self.products) + 1
+                self.products.append(item)
             self.update_table()
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể đọc file Excel: {e}")
@@ -227,32 +223,48 @@ class KnapsackUI:
             crossover_type = self.crossover_options[self.crossover_combo.get()]
             selection_type = self.selection_options[self.selection_combo.get()]
             mutation_type = self.mutation_options[self.mutation_combo.get()]
+            if generations < 1 or population_size < 1 or num_runs < 1:
+                raise ValueError
         except ValueError:
             messagebox.showerror("Lỗi", "Thông số không hợp lệ.")
+            return
         problem = KnapsackProblem(self.products, capacity=capacity) #bài toán cần giải 
-        best_logs = []
-
-        for run_idx in range(num_runs): #? lặp nhiều lần để làm gì 
-            solver = GeneticAlgorithm(
-                problem=problem,
-                populationSize=population_size,
-                generations=generations,
-                crossoverType=crossover_type,
-                selectionType=selection_type,
-                crossoverRate= crossover_rate,
-                mutationType=mutation_type,
-                mutationRate=mutation_rate
-            )
-            logs = solver.run()
-            best_gen = max(logs, key=lambda x: x["best"]) # thế hệ tốt nhất của mỗi lần chạy - num_runs 
-            best_logs.append((best_gen["best"], run_idx, best_gen, logs))
-
-        best_fitness, best_run_idx, best_gen_log, best_run_logs = max(best_logs, key=lambda x: x[0]) # thông số của lần chạy tốt nhất 
-        print(best_gen_log)
-
-        self.show_result_window(problem, population_size, selection_type, mutation_type, generations, crossover_type, mutation_rate, best_gen_log, best_run_logs, best_fitness, best_run_idx, num_runs)
-
-    def show_result_window(self, problem, population_size, selection_type, mutation_type, generations, crossover_type, mutation_rate, best_gen_log, best_run_logs, best_fitness, best_run_idx, num_runs):
+        params = {
+            "populationSize": population_size,
+            "generations": generations,
+            "crossoverType": crossover_type,
+            "selectionType": selection_type,
+            "crossoverRate": crossover_rate,
+            "mutationType": mutation_type,
+            "mutationRate": mutation_rate,
+            "logMode": "minimal"  # chỉ cần thống kê theo thế hệ và cá thể tốt nhất
+        }
+
+        # Các lần chạy độc lập được chia cho nhiều tiến trình và chạy ở luồng nền,
+        # tiến độ được gửi về qua hàng đợi để vẽ biểu đồ trực tiếp mà không chặn giao diện
+        executor = MultiRunExecutor(problem)
+        progress_queue, cancel_event = executor.progress_channel()
+        state = {"best_logs": [], "error": None, "done": False}
+
+        def worker():
+            try:
+                for run_idx, logs in executor.repeat(
+                    params, num_runs,
+                    progress_queue=progress_queue,
+                    progress_every=0,
+                    progress_seconds=0.1,
+                    cancel_event=cancel_event
+                ):
+                    state["best_logs"].append((logs.best_fitness, run_idx, logs))
+            except Exception as e:
+                state["error"] = e
+            finally:
+                state["done"] = True
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.show_result_window(num_runs, executor, progress_queue, cancel_event, state)
+
+    def show_result_window(self, num_runs, executor, progress_queue, cancel_event, state):
         result_window = tk.Toplevel(self.root)
         result_window.title("Biểu đồ thể hiện quy trình tiến hoá")
         fig = Figure(figsize=(7, 4), dpi=100)
@@ -281,84 +293,61 @@ class KnapsackUI:
         log_text.pack(fill="both", expand=True)
         log_text.config(state='disabled')  # Bắt đầu ở trạng thái không chỉnh sửa
 
-        log_text.config(state='normal')
-        log_text.insert("end", f"Thế hệ tốt nhất của mỗi lần chạy : {best_gen_log['generation']},Cá thể tốt nhất :{best_gen_log['bestIndividual']}, best fitness : {best_gen_log['best']}\n")
-        log_text.see("end")  # Tự động cuộn xuống cuối
-        log_text.config(state='disabled')
-
-
-        generations_list, best_list, avg_list, worst_list = [], [], [], []
-        current_log_index = 0 
+        status_label = tk.Label(result_window, text=f"Đang chạy 0/{num_runs} lần...")
+        status_label.pack()
+        stop_button = tk.Button(result_window, text="Dừng", command=cancel_event.set)
+        stop_button.pack(pady=(5, 0))
 
-        def update_chart(): 
-            nonlocal current_log_index
+        def on_close():
+            cancel_event.set()
+            result_window.destroy()
 
-            if current_log_index >= len(best_run_logs):
-                # Khi cập nhật xong tất cả log → vẽ dòng mô tả cuối cùng
-                fig.text(
-                    0.5, 0.95,
-                    f"Lần chạy tốt nhất: {best_run_idx + 1}/{num_runs} | Fitness cao nhất: {best_fitness:.2f}",
-                    ha='center', va='bottom',
-                    fontsize=10, color='purple', fontweight='bold'
-                )
-                canvas.draw()
-                return
+        result_window.protocol("WM_DELETE_WINDOW", on_close)
 
-            log = best_run_logs[current_log_index]
-            generations_list.append(log["generation"])
-            best_list.append(log["best"])
-            avg_list.append(log["avg"])
-            worst_list.append(log["worst"])
+        def is_corner(lst, i, threshold=5):
+            if i <= 0 or i >= len(lst) - 1:
+                return False
+            dy1 = lst[i] - lst[i - 1]
+            dy2 = lst[i + 1] - lst[i]
+            return abs(dy2 - dy1) > threshold
 
+        def draw_chart(generations_list, best_list, avg_list, worst_list, final=False):
             best_line.set_data(generations_list, best_list)
             avg_line.set_data(generations_list, avg_list)
             worst_line.set_data(generations_list, worst_list)
 
             for txt in ax.texts:
                 txt.remove()
-            # for i in range(1, len(generations_list) - 1):
-            #     for lst, color in [(best_list, 'green'), (avg_list, 'blue'), (worst_list, 'red')]:
-            #         prev_y, curr_y, next_y = lst[i - 1], lst[i], lst[i + 1]
-            #         if curr_y != prev_y or curr_y != next_y:
-            #             ax.annotate(f"{curr_y:.1f}", (generations_list[i], curr_y),
-            #                         textcoords="offset points", xytext=(0, 5),
-            #                         ha='center', fontsize=8, color=color)
-                    
-            def is_corner(lst, i, threshold=5):
-                if i <= 0 or i >= len(lst) - 1:
-                    return False
-                dy1 = lst[i] - lst[i - 1]
-                dy2 = lst[i + 1] - lst[i]
-                return abs(dy2 - dy1) > threshold
+
+            if final and best_list:
+                max_best = max(best_list)
+                min_best = min(best_list)
+                idx_max_best = best_list.index(max_best)
+                idx_min_best = best_list.index(min_best)
+
+                ax.annotate(f"Max: {max_best:.1f}", (generations_list[idx_max_best], max_best),
+                            textcoords="offset points", xytext=(0, 10), ha='center',
+                            fontsize=9, fontweight='bold', color='green')
+
+                ax.annotate(f"Min: {min_best:.1f}", (generations_list[idx_min_best], min_best),
+                            textcoords="offset points", xytext=(0, -15), ha='center',
+                            fontsize=9, fontweight='bold', color='green')
+
+                # Worst line
+                max_worst = max(worst_list)
+                min_worst = min(worst_list)
+                idx_max_worst = worst_list.index(max_worst)
+                idx_min_worst = worst_list.index(min_worst)
+
+                ax.annotate(f"Max: {max_worst:.1f}", (generations_list[idx_max_worst], max_worst),
+                            textcoords="offset points", xytext=(0, 10), ha='center',
+                            fontsize=9, fontweight='bold', color='red')
+
+                ax.annotate(f"Min: {min_worst:.1f}", (generations_list[idx_min_worst], min_worst),
+                            textcoords="offset points", xytext=(0, -15), ha='center',
+                            fontsize=9, fontweight='bold', color='red')
 
             for i in range(1, len(generations_list) - 1):
-                if current_log_index == len(best_run_logs) - 1:
-                    max_best = max(best_list)
-                    min_best = min(best_list)
-                    idx_max_best = best_list.index(max_best)
-                    idx_min_best = best_list.index(min_best)
-
-                    ax.annotate(f"Max: {max_best:.1f}", (generations_list[idx_max_best], max_best),
-                                textcoords="offset points", xytext=(0, 10), ha='center',
-                                fontsize=9, fontweight='bold', color='green')
-                    
-                    ax.annotate(f"Min: {min_best:.1f}", (generations_list[idx_min_best], min_best),
-                                textcoords="offset points", xytext=(0, -15), ha='center',
-                                fontsize=9, fontweight='bold', color='green')
-
-                    # Worst line
-                    max_worst = max(worst_list)
-                    min_worst = min(worst_list)
-                    idx_max_worst = worst_list.index(max_worst)
-                    idx_min_worst = worst_list.index(min_worst)
-
-                    ax.annotate(f"Max: {max_worst:.1f}", (generations_list[idx_max_worst], max_worst),
-                                textcoords="offset points", xytext=(0, 10), ha='center',
-                                fontsize=9, fontweight='bold', color='red')
-
-                    ax.annotate(f"Min: {min_worst:.1f}", (generations_list[idx_min_worst], min_worst),
-                                textcoords="offset points", xytext=(0, -15), ha='center',
-                                fontsize=9, fontweight='bold', color='red')
                 gen = generations_list[i]
                 # Đánh dấu các danh sách muốn xét
                 data_series = [
@@ -388,42 +377,13 @@ class KnapsackUI:
                         ax.annotate(f"{worst_list[i]:.1f}", (gen, worst_list[i]),
                                     textcoords="offset points", xytext=(0, -10),
                                     ha='center', fontsize=8, color='red')
-                        
-            # if best_list:
-            #     max_best = max(best_list)
-            #     idx_max_best = best_list.index(max_best)
-            #     gen_max_best = generations_list[idx_max_best]
-            #     ax.annotate(f"{max_best:.1f}", (gen_max_best, max_best),
-            #                 textcoords="offset points", xytext=(0, 5),
-            #                 ha='center', fontsize=8, color='green')
-
-            # if worst_list:
-            #     min_worst = min(worst_list)
-            #     idx_min_worst = worst_list.index(min_worst)
-            #     gen_min_worst = generations_list[idx_min_worst]
-            #     ax.annotate(f"{min_worst:.1f}", (gen_min_worst, min_worst),
-            #                 textcoords="offset points", xytext=(0, 5),
-            #                 ha='center', fontsize=8, color='red')
 
             ax.relim()
             ax.autoscale_view()
             fig.tight_layout() 
             canvas.draw()
 
-            current_log_index += 1
-            result_window.after(50, update_chart)  # gọi lại sau 100ms
-        #đưa vào input và gọi thuật toán 
-        update_chart()# nếu callback đc truyền và số thế hệ chia hết cho 10, tức là mỗi sau 10 thế hệ, biểu đồ sẽ được cập nhật lại 
-
-        fig.text(
-            0.5, 0.95,
-            f"Lần chạy tốt nhất: {best_run_idx + 1}/{num_runs} | Fitness cao nhất: {best_fitness:.2f}",
-            ha='center', va='bottom',
-            fontsize=10, color='purple', fontweight='bold'
-        )
-        canvas.draw()
-
-        def show_selected_items():
+        def show_selected_items(best_individual):
             item_window = tk.Toplevel(result_window)
             item_window.title("Vật phẩm được chọn - Thế hệ tốt nhất")
 
@@ -438,12 +398,91 @@ class KnapsackUI:
             item_tree.configure(yscrollcommand=scrollbar.set)
             scrollbar.pack(side="right", fill="y")
 
-            for i, qty in enumerate(best_gen_log['bestIndividual']):
+            for i, qty in enumerate(best_individual):
                 if qty > 0:
                     p = self.products[i]
-                    item_tree.insert("", "end", values=(p["name"], qty, p["weight"], p["value"]))
+                    item_tree.insert("", "end", values=(p["name"], int(qty), p["weight"], p["value"]))
 
-        tk.Button(result_window, text="Xem vật phẩm được chọn", command=show_selected_items).pack(pady=(5, 10))
+        def finish():
+            executor.shutdown()
+            stop_button.config(state='disabled')
+            if state["error"] is not None:
+                messagebox.showerror("Lỗi", f"Không chạy được thuật toán: {state['error']}")
+                return
+            if not state["best_logs"]:
+                status_label.config(text="Đã dừng, chưa có kết quả.")
+                return
+
+            best_fitness, best_run_idx, best_run_logs = max(state["best_logs"], key=lambda x: x[0]) # thông số của lần chạy tốt nhất 
+            best_gen_log = best_run_logs[best_run_logs.best_generation - 1]
+            print(best_gen_log)
 
-    
-     
\ No newline at end of file
+            draw_chart(
+                list(range(1, len(best_run_logs) + 1)),
+                best_run_logs.best.tolist(),
+                best_run_logs.avg.tolist(),
+                best_run_logs.worst.tolist(),
+                final=True
+            )
+            fig.text(
+                0.5, 0.95,
+                f"Lần chạy tốt nhất: {best_run_idx + 1}/{num_runs} | Fitness cao nhất: {best_fitness:.2f}",
+                ha='center', va='bottom',
+                fontsize=10, color='purple', fontweight='bold'
+            )
+            canvas.draw()
+
+            cancelled = sum(1 for _, _, logs in state["best_logs"] if logs.stop_reason == 'cancelled')
+            status_label.config(
+                text=f"Hoàn thành {len(state['best_logs'])}/{num_runs} lần chạy"
+                + (f" ({cancelled} lần bị dừng giữa chừng)" if cancelled else "")
+            )
+
+            log_text.config(state='normal')
+            log_text.insert("end", f"Thế hệ tốt nhất của mỗi lần chạy : {best_gen_log['generation']},Cá thể tốt nhất :{[int(q) for q in best_gen_log['bestIndividual']]}, best fitness : {best_gen_log['best']}\n")
+            log_text.see("end")  # Tự động cuộn xuống cuối
+            log_text.config(state='disabled')
+
+            tk.Button(
+                result_window, text="Xem vật phẩm được chọn",
+                command=lambda: show_selected_items(best_run_logs.best_individual)
+            ).pack(pady=(5, 10))
+
+        # Tiến độ từng lần chạy: run_idx → (thế hệ, best, avg, worst)
+        series = {}
+
+        def poll_progress():
+            if not result_window.winfo_exists():
+                # Cửa sổ đã đóng: chờ các lần chạy dừng rồi giải phóng tiến trình
+                if state["done"]:
+                    executor.shutdown()
+                else:
+                    self.root.after(100, poll_progress)
+                return
+            updated = False
+            while True:
+                try:
+                    run_idx, generation, best, avg, worst = progress_queue.get_nowait()
+                except Empty:
+                    break
+                except (EOFError, OSError):
+                    break
+                gens, bests, avgs, worsts = series.setdefault(run_idx, ([], [], [], []))
+                gens.append(generation)
+                bests.append(best)
+                avgs.append(avg)
+                worsts.append(worst)
+                updated = True
+
+            if updated:
+                # Hiển thị trực tiếp lần chạy đang dẫn đầu
+                leader = max(series, key=lambda i: max(series[i][1]))
+                draw_chart(*series[leader])
+            status_label.config(text=f"Đang chạy {len(state['best_logs'])}/{num_runs} lần...")
+
+            if state["done"]:
+                finish()
+            else:
+                result_window.after(100, poll_progress)
+
+        poll_progress()
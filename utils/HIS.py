@@ -1,13 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 from collections import Counter, defaultdict
 import threading
 import numpy as np
-from problem.knapsack import KnapsackProblem
-from problem.genetic import GeneticAlgorithm
+from problem.loader import load_problem
+from problem.sweep import ParameterSweep
 
 class HistogramGUI(tk.Tk):
     def __init__(self):
@@ -86,22 +85,15 @@ class HistogramGUI(tk.Tk):
 
     def load_excel(self):
         file_path = filedialog.askopenfilename(
-            filetypes=[("Excel files", "*.xlsx *.xls")],
+            filetypes=[("Item files", "*.xlsx *.xls *.csv *.parquet")],
             title="Chọn file Excel chứa dữ liệu bài toán Knapsack"
         )
         if not file_path:
             return
 
         try:
-            df = pd.read_excel(file_path)
-            required_cols = {'name', 'weight', 'value', 'Max_quantity'}
-            if not required_cols.issubset(set(df.columns)):
-                messagebox.showerror("Lỗi", f"File Excel phải chứa các cột: {required_cols}")
-                return
-
-            items = df.to_dict(orient='records')
-
-            self.problem = KnapsackProblem(items, capacity=1)
+            # Đọc thẳng thành các cột numpy, không dựng dict cho từng vật phẩm
+            self.problem = load_problem(file_path, capacity=1)
             self.lbl_file.config(text=f"Đã tải file: {file_path.split('/')[-1]}")
             messagebox.showinfo("Thành công", "Đã tải bài toán từ file Excel thành công!")
 
@@ -163,47 +155,23 @@ class HistogramGUI(tk.Tk):
             self.after(0, lambda: self.btn_run.config(state=tk.NORMAL))
             return
 
+        # Tên tham số trên giao diện → tham số của GeneticAlgorithm
+        param_keys = {
+            "Generations": "generations",
+            "Population Size": "populationSize",
+            "Crossover Rate": "crossoverRate",
+            "Mutation Rate": "mutationRate",
+            "Runs": "runs"
+        }
+
         try:
-            for v in values:
-                param_settings = fixed_params.copy()
-                if param_name == "Generations":
-                    param_settings["generations"] = v
-                elif param_name == "Population Size":
-                    param_settings["populationSize"] = v
-                elif param_name == "Crossover Rate":
-                    param_settings["crossoverRate"] = v
-                elif param_name == "Mutation Rate":
-                    param_settings["mutationRate"] = v
-                elif param_name == "Runs":
-                    param_settings["runs"] = v
-
-                all_best_fitnesses = []
-
-                for _ in range(param_settings["runs"]):
-                    ga = GeneticAlgorithm(
-                        problem=self.problem,
-                        populationSize=param_settings["populationSize"],
-                        generations=param_settings["generations"],
-                        crossoverType=param_settings["crossoverType"],
-                        selectionType=param_settings["selectionType"],
-                        mutationType=param_settings["mutationType"],
-                        crossoverRate=param_settings["crossoverRate"],
-                        mutationRate=param_settings["mutationRate"],
-                    )
-                    logs = ga.run()
-                    best_fitnesses = [log['best'] for log in logs]
-                    all_best_fitnesses.append(best_fitnesses)
-
-                min_len = min(len(run) for run in all_best_fitnesses)
-                avg_fitness = sum([max(run[:min_len]) for run in all_best_fitnesses]) / param_settings["runs"]
-                fitness_threshold = avg_fitness * 1.1
-
-                count_over_threshold = 0
-                for run in all_best_fitnesses:
-                    if max(run[:min_len]) > fitness_threshold:
-                        count_over_threshold += 1
-
-                fitness_counter[v] = count_over_threshold
+            base_params = fixed_params.copy()
+            runs = base_params.pop("runs")
+            sweep = ParameterSweep(self.problem, base_params, runs=runs)
+            param_key = param_keys[param_name]
+
+            for cell, stats in sweep.run({param_key: values}):
+                fitness_counter[cell[param_key]] = stats["count_over_threshold"]
 
             self.after(0, self.plot_histogram, fitness_counter, param_name)
 